@@ -0,0 +1,130 @@
+"""Measure the memory used to decode each type of the seeded corpus.
+
+Run with `python -m benchmarks.bench_memory` from the repository root.
+For every case this reports the payload size, the peak memory traced by
+`tracemalloc` while parsing, and the number of memory blocks the parsed
+value holds per decoded item.
+
+`--save FILE` writes the results as JSON. `--compare FILE` exits with an error
+if any case now peaks more than `--tolerance` times higher than in FILE.
+"""
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Dict, List, NamedTuple
+
+from benchmarks.corpus import Case, build_corpus
+
+# The drawn examples are repeated to make the payloads large.
+REPEAT = 20
+TOLERANCE = 1.2
+
+
+class Measurement(NamedTuple):
+    """The memory used to parse one corpus case."""
+
+    name: str
+    payload_bytes: int
+    items: int
+    peak_bytes: int
+    blocks: int
+
+    @property
+    def blocks_per_item(self) -> float:
+        """Memory blocks held by the parsed value, per decoded item."""
+        return self.blocks / self.items if self.items else 0
+
+
+def measure(case: Case) -> Measurement:
+    """Parse one case under `tracemalloc`.
+
+    Args:
+        case (Case): the corpus case.
+
+    Returns:
+        Measurement: the payload size, the peak memory and the live blocks.
+    """
+    payload = case.borsh_type.build(case.value * REPEAT)
+    tracemalloc.start()
+    parsed = case.borsh_type.parse(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    # Taken while the parsed value is alive, so its blocks are counted.
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return Measurement(case.name, len(payload), len(parsed), peak, blocks)
+
+
+def _regressions(
+    results: List[Measurement],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[str]:
+    return [
+        result.name
+        for result in results
+        if result.name in baseline
+        and result.peak_bytes > baseline[result.name]["peak_bytes"] * tolerance
+    ]
+
+
+def _parser() -> ArgumentParser:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    return parser
+
+
+def _write_table(results: List[Measurement]) -> None:
+    sys.stdout.write(
+        "{0:<40} {1:>10} {2:>12} {3:>8}\n".format(
+            "case",
+            "payload",
+            "peak",
+            "blk/item",
+        ),
+    )
+    for result in results:
+        sys.stdout.write(
+            "{0:<40} {1:>10} {2:>12} {3:>8.2f}\n".format(
+                result.name,
+                result.payload_bytes,
+                result.peak_bytes,
+                result.blocks_per_item,
+            ),
+        )
+
+
+def _save(results: List[Measurement], filename: str) -> None:
+    with open(filename, "w") as save_file:
+        json.dump(
+            {result.name: result._asdict() for result in results},  # noqa: WPS437
+            save_file,
+            indent=2,
+        )
+
+
+def main() -> int:
+    """Measure the corpus, then save or compare the results.
+
+    Returns:
+        int: the exit code, 1 if a case regressed.
+    """
+    args = _parser().parse_args()
+    results = [measure(case) for case in build_corpus()]
+    _write_table(results)
+    if args.save:
+        _save(results, args.save)
+    if not args.compare:
+        return 0
+    with open(args.compare) as baseline_file:
+        regressed = _regressions(results, json.load(baseline_file), args.tolerance)
+    for name in regressed:
+        sys.stderr.write("peak memory regressed: {0}\n".format(name))
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Measure how parse_many and build_many scale with the number of threads.
+
+Run with `python benchmarks/bench_threads.py`. On a free-threaded CPython
+build (3.13t or later) the throughput should grow with the thread count.
+With the GIL it should stay flat, and 1 thread should match a plain loop.
+"""
+import sys
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, List
+
+from borsh_construct import (
+    U8,
+    U64,
+    CStruct,
+    Enum,
+    HashMap,
+    Option,
+    String,
+    Vec,
+    build_many,
+    parse_many,
+)
+from borsh_construct.batch import gil_enabled
+
+THREADS = (1, 2, 4, 8)
+ACCOUNTS = 20000
+REPEATS = 3
+ACCOUNT = CStruct(
+    "owner" / String,
+    "balances" / HashMap(String, U64),
+    "delegate" / Option(String),
+    "state" / Enum("Closed", "Open" / CStruct("since" / U64), enum_name="State"),
+    "log" / Vec(U8),
+)
+STATE = ACCOUNT.subcons[3].subcon.enum  # type: ignore
+
+
+def _account(idx: int) -> dict:
+    return {
+        "owner": "owner{0}".format(idx),
+        "balances": {"sol": idx, "usdc": idx * 2},
+        "delegate": None if idx % 2 else "delegate",
+        "state": STATE.Open(since=idx),
+        "log": list(range(idx % 64)),
+    }
+
+
+def _best_time(run: Callable[[], Any]) -> float:
+    timings: List[float] = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        run()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def _report(threads: int, accounts: List[dict], payloads: List[bytes]) -> None:
+    parse_time = _best_time(partial(parse_many, ACCOUNT, payloads, threads))
+    build_time = _best_time(partial(build_many, ACCOUNT, accounts, threads))
+    sys.stdout.write(
+        "{0} threads: {1:.0f} parses/s, {2:.0f} builds/s\n".format(
+            threads,
+            ACCOUNTS / parse_time,
+            ACCOUNTS / build_time,
+        ),
+    )
+
+
+def main() -> None:
+    """Print items per second for each thread count."""
+    accounts = [_account(idx) for idx in range(ACCOUNTS)]
+    payloads = build_many(ACCOUNT, accounts, max_workers=1)
+    baseline = _best_time(lambda: [ACCOUNT.parse(payload) for payload in payloads])
+    sys.stdout.write("GIL enabled: {0}\n".format(gil_enabled()))
+    sys.stdout.write("plain loop: {0:.0f} parses/s\n".format(ACCOUNTS / baseline))
+    for threads in THREADS:
+        _report(threads, accounts, payloads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""A seeded corpus of large payloads, drawn from the Hypothesis test strategies.
+
+Each case is a name, a `Vec` type and a list of many drawn examples,
+so the payloads are large even though Hypothesis itself only draws
+small examples. The same seed always gives
+the same corpus.
+"""
+from types import MappingProxyType
+from typing import Any, List, NamedTuple
+
+import hypothesis.strategies as st
+from hypothesis import HealthCheck, Phase, given, seed, settings
+
+from borsh_construct import (
+    F32,
+    F64,
+    I8,
+    I16,
+    I32,
+    I64,
+    I128,
+    U8,
+    U16,
+    U32,
+    U64,
+    U128,
+    Bytes,
+    CStruct,
+    Enum,
+    HashMap,
+    Option,
+    String,
+    TupleStruct,
+    Vec,
+)
+from tests.test_hypothesis import borsh_simple_types, type_map
+
+SEED = 1234
+EXAMPLES = 500
+TYPE_NAMES = MappingProxyType(
+    {
+        U8: "U8",
+        I8: "I8",
+        U16: "U16",
+        I16: "I16",
+        U32: "U32",
+        I32: "I32",
+        U64: "U64",
+        I64: "I64",
+        U128: "U128",
+        I128: "I128",
+        F32: "F32",
+        F64: "F64",
+        Bytes: "Bytes",
+        String: "String",
+    },
+)
+EVENT = Enum(
+    "Unit",
+    "Pair" / TupleStruct(U8, String),
+    "Named" / CStruct("amount" / U64, "memo" / Option(Bytes)),
+    enum_name="Event",
+)
+
+
+class Case(NamedTuple):
+    """One corpus entry."""
+
+    name: str
+    borsh_type: Any
+    value: List[Any]
+
+
+def draw(strategy: Any, count: int = EXAMPLES) -> List[Any]:
+    """Draw up to `count` examples from a strategy, deterministically.
+
+    Args:
+        strategy (Any): a Hypothesis strategy.
+        count (int): the number of examples to draw.
+
+    Returns:
+        List[Any]: the examples, the same ones on every run.
+    """
+    examples: List[Any] = []
+
+    @seed(SEED)
+    @settings(
+        max_examples=count,
+        database=None,
+        phases=(Phase.generate,),
+        suppress_health_check=list(HealthCheck),
+        deadline=None,
+    )
+    @given(strategy)
+    def collect(example: Any) -> None:  # noqa: WPS430
+        examples.append(example)
+
+    collect()
+    return examples
+
+
+def _event_strategy() -> Any:
+    enum = EVENT.enum
+    return st.one_of(
+        st.just(enum.Unit()),
+        st.builds(
+            lambda left, right: enum.Pair((left, right)),
+            type_map[U8],
+            type_map[String],
+        ),
+        st.builds(
+            enum.Named,
+            amount=type_map[U64],
+            memo=st.none() | type_map[Bytes],
+        ),
+    )
+
+
+def _nested_cases() -> List[Case]:
+    balances = st.dictionaries(
+        type_map[String],
+        st.none() | st.lists(type_map[U64], max_size=8),
+        max_size=8,
+    )
+    return [
+        Case(
+            "Vec<HashMap<String, Option<Vec<U64>>>>",
+            Vec(HashMap(String, Option(Vec(U64)))),
+            draw(balances),
+        ),
+        Case(
+            "Vec<Vec<Option<String>>>",
+            Vec(Vec(Option(String))),
+            draw(st.lists(st.none() | type_map[String], max_size=16)),
+        ),
+        Case("Vec<Enum>", Vec(EVENT), draw(_event_strategy())),
+    ]
+
+
+def _simple_case(borsh_type: Any) -> Case:
+    name = "Vec<{0}>".format(TYPE_NAMES[borsh_type])
+    return Case(name, Vec(borsh_type), draw(type_map[borsh_type]))
+
+
+def build_corpus() -> List[Case]:
+    """Return the full corpus: every simple type, then the nested types."""
+    simple_cases = [_simple_case(simple) for simple in borsh_simple_types]
+    return simple_cases + _nested_cases()
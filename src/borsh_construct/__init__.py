@@ -22,8 +22,17 @@ from .core import (
     Option,
     HashMap,
     HashSet,
+    trusted,
+    set_max_length,
 )
-from .enum import Enum
+from .enum import Dispatcher, Enum
+from .cache import Cached, DecodeCache
+from .buffer import parse_buffer
+from .columnar import Columnar
+from .stream import HashingSink, build_hash, build_iter
+from .layout import VecView
+from .batch import build_many, parse_many
+from .schema import load_schema, schema_source
 
 try:
     __version__ = version(__name__)
@@ -53,4 +62,19 @@ __all__ = [
     "Option",
     "HashMap",
     "HashSet",
+    "Cached",
+    "DecodeCache",
+    "trusted",
+    "parse_buffer",
+    "set_max_length",
+    "Columnar",
+    "build_iter",
+    "build_hash",
+    "HashingSink",
+    "VecView",
+    "parse_many",
+    "build_many",
+    "load_schema",
+    "schema_source",
+    "Dispatcher",
 ]
@@ -0,0 +1,93 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import cpu_count
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+from construct import Construct
+
+# Each worker gets a few chunks, so that uneven payloads still balance out.
+_CHUNKS_PER_WORKER = 4
+
+
+def gil_enabled() -> bool:
+    """Return False on a free-threaded CPython build with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def default_workers() -> int:
+    """Return the number of threads `parse_many` and `build_many` use by default.
+
+    With the GIL, threads cannot speed up decoding, so this is 1 and
+    the batch runs in the calling thread. Without it, this is the CPU count.
+    """
+    return 1 if gil_enabled() else cpu_count() or 1
+
+
+def _run_chunk(func: Callable[[Any], Any], chunk: Sequence[Any]) -> List[Any]:
+    return [func(item) for item in chunk]
+
+
+def _map(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: Optional[int],
+) -> List[Any]:
+    workers = default_workers() if max_workers is None else max_workers
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return _run_chunk(func, items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        done = pool.map(partial(_run_chunk, func), _chunks(items, workers))
+        return [result for chunk_results in done for result in chunk_results]
+
+
+def _chunks(items: List[Any], workers: int) -> List[List[Any]]:
+    chunk_size = -(-len(items) // (workers * _CHUNKS_PER_WORKER))
+    return [
+        items[start:start + chunk_size]
+        for start in range(0, len(items), chunk_size)
+    ]
+
+
+def parse_many(
+    subcon: Construct,
+    payloads: Iterable[Any],
+    max_workers: Optional[int] = None,
+    **contextkw,
+) -> List[Any]:
+    """Parse many payloads, on several threads if that can help.
+
+    Borsh types keep no state between calls, so one type can be shared by
+    all the threads.
+
+    Args:
+        subcon (Construct): the type to parse.
+        payloads (Iterable[Any]): bytes-like objects to parse.
+        max_workers (Optional[int]): the number of threads, `default_workers()` if None.
+        contextkw: context entries, as for `Construct.parse`.
+
+    Returns:
+        List[Any]: the parsed values, in the order of `payloads`.
+    """
+    return _map(partial(subcon.parse, **contextkw), payloads, max_workers)
+
+
+def build_many(
+    subcon: Construct,
+    objs: Iterable[Any],
+    max_workers: Optional[int] = None,
+    **contextkw,
+) -> List[bytes]:
+    """Build many values, on several threads if that can help.
+
+    Args:
+        subcon (Construct): the type to build.
+        objs (Iterable[Any]): the values to build.
+        max_workers (Optional[int]): the number of threads, `default_workers()` if None.
+        contextkw: context entries, as for `Construct.build`.
+
+    Returns:
+        List[bytes]: the encodings, in the order of `objs`.
+    """
+    return _map(partial(subcon.build, **contextkw), objs, max_workers)
@@ -0,0 +1,123 @@
+from functools import total_ordering
+from typing import Any, Optional
+from construct import Construct
+
+
+class BufferStream(object):
+    """A read-only stream over a bytes-like object.
+
+    Unlike `io.BytesIO`, this never copies the underlying buffer and
+    it can hand out zero-copy `memoryview` slices of it.
+    """
+
+    def __init__(self, data: Any) -> None:
+        """Init BufferStream.
+
+        Args:
+            data (Any): a bytes-like object such as bytes, bytearray or mmap.
+        """
+        # Read-only slices hash like bytes, even over a bytearray.
+        self.view = memoryview(data).cast("B").toreadonly()
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes, or the rest if size is negative."""  # noqa: DAR101
+        return self.read_view(size).tobytes()
+
+    def read_view(self, size: int = -1) -> memoryview:
+        """Like `read`, but return a slice instead of a copy."""  # noqa: DAR101
+        start = self.position
+        end = len(self.view) if size < 0 else min(start + size, len(self.view))
+        self.position = end
+        return self.view[start:end]
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self.position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """Move to a new position, like `io.IOBase.seek`."""  # noqa: DAR101
+        origin = (0, self.position, len(self.view))[whence]
+        self.position = max(origin + offset, 0)
+        return self.position
+
+    def seekable(self) -> bool:
+        """Return True: BufferStreams are always seekable."""
+        return True
+
+    def readable(self) -> bool:
+        """Return True: BufferStreams are always readable."""
+        return True
+
+
+@total_ordering
+class LazyString(object):
+    """A UTF-8 string that is only decoded when it is used.
+
+    Compares and hashes like the decoded `str`, which `str(lazy)` returns.
+    """
+
+    def __init__(self, view: memoryview) -> None:
+        """Init LazyString.
+
+        Args:
+            view (memoryview): the UTF-8 encoded string.
+        """
+        self.view = view
+        self._decoded: Optional[str] = None
+
+    def __str__(self) -> str:
+        """Decode the string, at most once."""
+        if self._decoded is None:
+            self._decoded = str(self.view, "utf8")
+        return self._decoded
+
+    def __repr__(self) -> str:
+        """Show the decoded string."""
+        decoded = str(self)
+        return f"LazyString({decoded!r})"
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with a str or another LazyString."""  # noqa: DAR101
+        if isinstance(other, LazyString):
+            return self.view == other.view
+        return str(self) == other
+
+    def __lt__(self, other: object) -> bool:
+        """Order like the decoded string."""  # noqa: DAR101
+        return str(self) < str(other)
+
+    def __hash__(self) -> int:
+        """Hash like the decoded string."""
+        return hash(str(self))
+
+    def __len__(self) -> int:
+        """Return the length of the decoded string."""
+        return len(str(self))
+
+
+def parse_buffer(subcon: Construct, data: Any, **contextkw) -> Any:
+    """Parse a bytes-like object without copying `Bytes` and `String` payloads.
+
+    `Bytes` values are returned as `memoryview` slices of `data` and `String`
+    values as `LazyString` objects that decode on first use. `Bytes` keys of
+    a `HashMap` and members of a `HashSet` are still copied, so that they hash.
+
+    The slices share memory with `data`: they keep it alive and show any later
+    changes to it. While a slice exists, a bytearray cannot be resized and an
+    mmap cannot be closed (Python raises `BufferError`), so release the slices
+    or copy them with `bytes()` before doing either.
+
+    Strings are not checked for valid UTF-8 while parsing. Invalid text only
+    raises `UnicodeDecodeError` when the `LazyString` is first used (compared,
+    hashed or converted with `str()`).
+
+    Args:
+        subcon (Construct): the type to parse.
+        data (Any): a bytes-like object such as bytes, bytearray or mmap.
+        contextkw: context entries, as for `Construct.parse`.
+
+    Returns:
+        Any: the parsed value.
+    """
+    return subcon.parse_stream(BufferStream(data), **contextkw)  # type: ignore
@@ -0,0 +1,213 @@
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import blake2b
+from io import BytesIO
+from struct import pack
+from threading import Lock
+from typing import Any, Hashable, NamedTuple, Optional
+from construct import Construct, Subconstruct, stream_write
+import attr
+
+DIGEST_THRESHOLD = 256
+DIGEST_SIZE = 32
+_MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics, in the style of `functools.lru_cache`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that were hits, or 0 before any lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+class _LRU(object):
+    """A small thread-safe LRU mapping that counts hits and misses."""
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            try:
+                cached = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: Hashable, cached: Any) -> None:
+        with self._lock:
+            self._data[key] = cached
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.maxsize,
+                len(self._data),
+                self.evictions,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def _encode_cache_key(obj: Any) -> Hashable:
+    # Equal values must have equal encodings, but 0.0 == -0.0,
+    # so floats are keyed by their bits.
+    if isinstance(obj, float):
+        return float, pack("<d", obj)
+    if isinstance(obj, (tuple, frozenset)):
+        container = frozenset if isinstance(obj, frozenset) else tuple
+        return container, container(map(_encode_cache_key, obj))
+    if isinstance(obj, dict):
+        return dict, tuple(map(_encode_cache_key, obj.items()))
+    if attr.has(type(obj)):
+        return type(obj), _encode_cache_key(attr.astuple(obj, recurse=False))
+    return obj
+
+
+class Cached(Subconstruct):
+    """Wrap a type so that the encodings of repeated values are reused.
+
+    Values are looked up by equality, except that floats are compared by
+    their bits so that 0.0 and -0.0 stay apart. Only hashable values are cached:
+    ints, strings, bytes, tuples (for `TupleStruct`), frozensets (for
+    `HashSet`), dicts with hashable items (for `HashMap`) and variants of
+    an `Enum` created with `frozen=True`. Anything else is built as usual.
+
+    The wrapped type must not depend on its surrounding context,
+    which holds for every Borsh type.
+    """
+
+    def __init__(self, subcon: Construct, maxsize: int = 128) -> None:
+        """Init Cached.
+
+        Args:
+            subcon (Construct): the type whose encodings are cached.
+            maxsize (int): the number of encodings to keep.
+        """
+        super().__init__(subcon)  # type: ignore
+        self._cache = _LRU(maxsize)
+
+    def __copy__(self) -> "Cached":
+        """Copy the type with an empty cache of its own.
+
+        Copies such as `trusted(cached)` may build values the original
+        rejects, so they must never share encodings with it.
+        """  # noqa: DAR201
+        return Cached(self.subcon, self._cache.maxsize)
+
+    def cache_info(self) -> CacheInfo:
+        """Return hit and miss statistics for this cache."""
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Drop all cached encodings and reset the statistics."""
+        self._cache.clear()
+
+    def _build(self, obj, stream, context, path):
+        key = _encode_cache_key(obj)
+        try:
+            encoded = self._cache.get(key)
+        except TypeError:
+            return self.subcon._build(obj, stream, context, path)  # noqa: WPS437
+        if encoded is None:
+            substream = BytesIO()
+            self.subcon._build(obj, substream, context, path)  # noqa: WPS437
+            encoded = substream.getvalue()
+            self._cache.put(key, encoded)
+        stream_write(stream, encoded, len(encoded), path)
+        return obj
+
+
+class DecodeCache(object):
+    """Parse a type through a bounded LRU cache keyed by the input bytes.
+
+    Useful when the same payloads are parsed over and over. Inputs longer
+    than `digest_threshold` bytes are keyed by their BLAKE2b digest instead
+    of a copy of the bytes.
+
+    By default each hit returns a deep copy of the cached value, so callers
+    may mutate it. With `copy=False` all hits share one value, which must
+    then be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        subcon: Construct,
+        maxsize: int = 128,
+        digest_threshold: int = DIGEST_THRESHOLD,
+        copy: bool = True,
+    ) -> None:
+        """Init DecodeCache.
+
+        Args:
+            subcon (Construct): the type to parse.
+            maxsize (int): the number of parsed values to keep.
+            digest_threshold (int): inputs longer than this are keyed by digest.
+            copy (bool): whether hits return a deep copy of the cached value.
+        """
+        self.subcon = subcon
+        self.digest_threshold = digest_threshold
+        self.copy = copy
+        self._cache = _LRU(maxsize)
+
+    def parse(self, data: Any) -> Any:
+        """Parse data, reusing the result of an earlier parse of the same bytes.
+
+        Args:
+            data (Any): a bytes-like object.
+
+        Returns:
+            Any: the parsed value.
+        """
+        key = self._key(data)
+        parsed = self._cache.get(key, _MISSING)
+        if parsed is _MISSING:
+            parsed = self.subcon.parse(data)
+            self._cache.put(key, parsed)
+        return deepcopy(parsed) if self.copy else parsed
+
+    def cache_info(self) -> CacheInfo:
+        """Return hit, miss and eviction statistics for this cache."""
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Drop all cached values and reset the statistics."""
+        self._cache.clear()
+
+    def _key(self, data: Any) -> Hashable:
+        # Raw and digest keys are tagged apart: a short input that happens to
+        # equal the digest of a long one must not share its cache entry.
+        size = len(data)
+        if size > self.digest_threshold:
+            return "digest", size, blake2b(data, digest_size=DIGEST_SIZE).digest()
+        return "raw", bytes(data)
@@ -0,0 +1,283 @@
+from array import array
+from functools import cached_property
+from math import isnan
+from struct import calcsize
+from sys import byteorder
+from types import MappingProxyType
+from typing import Any, List, NamedTuple, Optional
+from construct import Construct, Flag, FormatField, FormatFieldError, Renamed
+from construct import SizeofError, stream_write
+
+from .core import U32, CStruct, FormatFieldNoNan, check_length, read_exact
+from .core import stream_remaining
+
+BACKENDS = ("array", "numpy")
+NAN_ERROR_MESSAGE = "Borsh does not support nan."
+_NUMPY_TYPES = MappingProxyType(
+    {
+        "b": "<i1",
+        "B": "<u1",
+        "h": "<i2",
+        "H": "<u2",
+        "l": "<i4",
+        "L": "<u4",
+        "q": "<i8",
+        "Q": "<u8",
+        "f": "<f4",
+        "d": "<f8",
+        "?": "?",
+    },
+)
+# array typecodes have platform-dependent sizes, so list all candidates.
+_ARRAY_TYPECODES = MappingProxyType(
+    {
+        "b": "b",
+        "B": "B",
+        "h": "h",
+        "H": "H",
+        "l": "il",
+        "L": "IL",
+        "q": "ql",
+        "Q": "QL",
+        "f": "f",
+        "d": "d",
+        "?": "B",
+    },
+)
+
+
+# Maps every byte to 0 or 1, to read Bool columns.
+_CANONICAL_BOOLS = bytes([0]) + bytes([1]) * 255
+
+
+class _Column(NamedTuple):
+    name: str
+    fmt: str
+    offset: int
+    size: int
+    nonan: bool
+
+    @property
+    def typecode(self) -> str:
+        candidates = _ARRAY_TYPECODES[self.fmt]
+        return next(code for code in candidates if array(code).itemsize == self.size)
+
+
+def _field_format(field: Construct) -> str:
+    subcon = field.subcon if isinstance(field, Renamed) else field
+    if subcon is Flag:
+        return "?"
+    if isinstance(subcon, FormatField) and subcon.fmtstr[0] == "<":
+        return subcon.fmtstr[1]
+    raise ValueError(
+        f"Columnar fields must be fixed-size numbers or Bool, found {field}",
+    )
+
+
+def _column(field: Construct, offset: int) -> _Column:
+    fmt = _field_format(field)
+    nonan = isinstance(field.subcon, FormatFieldNoNan)  # type: ignore
+    return _Column(str(field.name), fmt, offset, calcsize(f"<{fmt}"), nonan)
+
+
+def _columns(struct: CStruct) -> List[_Column]:
+    columns = []
+    offset = 0
+    for field in struct.subcons:
+        column = _column(field, offset)
+        columns.append(column)
+        offset += column.size
+    return columns
+
+
+def _check_nan(column: _Column, items: Any, path: str) -> None:
+    if column.nonan and any(map(isnan, items)):
+        raise FormatFieldError(NAN_ERROR_MESSAGE, path=path)
+
+
+def _gather(data: bytes, column: _Column, stride: int, count: int) -> bytearray:
+    column_data = bytearray(count * column.size)
+    for lane in range(column.size):
+        start = column.offset + lane
+        column_data[lane::column.size] = data[start::stride]  # noqa: WPS362
+    return column_data
+
+
+def _scatter(column_data: bytes, column: _Column, stride: int, out: bytearray) -> None:
+    for lane in range(column.size):
+        start = column.offset + lane
+        out[start::stride] = column_data[lane::column.size]  # noqa: WPS362
+
+
+class Columnar(Construct):
+    """A `Vec` of fixed-size `CStruct` records, stored column by column.
+
+    Parsing returns a dict mapping each field name to an `array.array`
+    (the default `"array"` backend) or a NumPy structured array (the `"numpy"`
+    backend). No Python object is created per record. Building accepts
+    either of these, or any mapping of field names to sequences.
+
+    The fields must be fixed-size numbers or `Bool`.
+    """
+
+    def __init__(
+        self,
+        struct: CStruct,
+        backend: str = "array",
+        max_length: Optional[int] = None,
+    ) -> None:
+        """Init Columnar.
+
+        Args:
+            struct (CStruct): the type of the records.
+            backend (str): `"array"` or `"numpy"`.
+            max_length (Optional[int]): the maximum number of records.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, found {backend}")
+        super().__init__()
+        self.struct = struct
+        self.backend = backend
+        self.max_length = max_length
+
+    @property
+    def struct(self) -> CStruct:
+        """The type of the records."""
+        return self._struct
+
+    @struct.setter
+    def struct(self, struct: CStruct) -> None:
+        # `trusted` swaps in an unvalidated copy, so the columns follow it.
+        columns = _columns(struct)
+        record_size = sum(column.size for column in columns)
+        if not record_size:
+            raise ValueError("Columnar records cannot be empty.")
+        self._struct = struct
+        self.columns = columns
+        self.record_size = record_size
+
+    @cached_property
+    def dtype(self) -> Any:
+        """The NumPy structured dtype of the records."""
+        import numpy  # noqa: WPS433
+
+        fields = [(column.name, _NUMPY_TYPES[column.fmt]) for column in self.columns]
+        return numpy.dtype(fields)
+
+    def _parse(self, stream, context, path):
+        count = U32.parse_stream(stream)
+        remaining = stream_remaining(stream, context)
+        check_length(count, self.max_length, self.record_size, remaining, path)
+        data = read_exact(stream, count * self.record_size, path, context)
+        if self.backend == "numpy":
+            return _parse_numpy(data, self.dtype, self.columns, path)
+        return {
+            column.name: _parse_column(column, data, self.record_size, count, path)
+            for column in self.columns
+        }
+
+    def _build(self, obj, stream, context, path):
+        lengths = {len(obj[column.name]) for column in self.columns}
+        if len(lengths) != 1:
+            raise ValueError("Columnar columns must all have the same length.")
+        count = lengths.pop()
+        check_length(count, self.max_length, 0, None, path)
+        U32.build_stream(count, stream)
+        if self.backend == "numpy":
+            data = _build_numpy(obj, count, self.dtype, self.columns, path)
+        else:
+            data = _build_columns(obj, self.columns, self.record_size, count, path)
+        stream_write(stream, data, len(data), path)
+        return obj
+
+    def _sizeof(self, context, path):
+        raise SizeofError("Columnar has no fixed size.", path=path)
+
+
+def _out_of_range(column: _Column, error: OverflowError, path: str) -> Exception:
+    return FormatFieldError(
+        f"struct '<{column.fmt}' error during building of {column.name}: {error}",
+        path=path,
+    )
+
+
+def _parse_column(column: _Column, data: bytes, stride: int, count: int, path: str):
+    column_data = _gather(data, column, stride, count)
+    if column.fmt == "?":
+        # Like `Bool`, read any non-zero byte as True.
+        column_data = column_data.translate(_CANONICAL_BOOLS)
+    items = array(column.typecode, column_data)
+    if byteorder == "big":  # pragma: no cover
+        items.byteswap()
+    _check_nan(column, items, path)
+    return items
+
+
+def _build_columns(
+    obj: Any,
+    columns: List[_Column],
+    stride: int,
+    count: int,
+    path: str,
+) -> bytes:
+    data = bytearray(count * stride)
+    for column in columns:
+        column_items = obj[column.name]
+        if column.fmt == "?":
+            # Like `Bool`, write any truthy value as 1.
+            column_items = map(bool, column_items)
+        try:
+            items = array(column.typecode, column_items)
+        except OverflowError as error:
+            raise _out_of_range(column, error, path)
+        _check_nan(column, items, path)
+        if byteorder == "big":  # pragma: no cover
+            items.byteswap()
+        _scatter(items.tobytes(), column, stride, data)
+    return bytes(data)
+
+
+def _check_numpy_nan(records: Any, columns: List[_Column], path: str) -> None:
+    import numpy  # noqa: WPS433
+
+    for column in columns:
+        if column.nonan and numpy.isnan(records[column.name]).any():
+            raise FormatFieldError(NAN_ERROR_MESSAGE, path=path)
+
+
+def _parse_numpy(data: bytes, dtype: Any, columns: List[_Column], path: str) -> Any:
+    import numpy  # noqa: WPS433
+
+    records = numpy.frombuffer(data, dtype=dtype)
+    _check_numpy_nan(records, columns, path)
+    return _canonical_numpy_bools(records, columns)
+
+
+def _canonical_numpy_bools(records: Any, columns: List[_Column]) -> Any:
+    for column in columns:
+        raw = records[column.name].view("u1") if column.fmt == "?" else None
+        if raw is not None and (raw > 1).any():
+            # Like `Bool`, read any non-zero byte as True. The records share
+            # the read-only input, so they are only copied when needed.
+            records = records.copy()
+            records[column.name] = raw != 0
+    return records
+
+
+def _build_numpy(
+    obj: Any,
+    count: int,
+    dtype: Any,
+    columns: List[_Column],
+    path: str,
+) -> bytes:
+    import numpy  # noqa: WPS433
+
+    records = numpy.empty(count, dtype=dtype)
+    for column in columns:
+        try:
+            records[column.name] = obj[column.name]
+        except OverflowError as error:
+            raise _out_of_range(column, error, path)
+    _check_numpy_nan(records, columns, path)
+    return records.tobytes()
@@ -1,14 +1,20 @@
-from typing import Any, Optional, List, Tuple
+from copy import copy
+from io import SEEK_END, BytesIO
+from itertools import repeat
+from typing import Any, Dict, Optional, List, Tuple, Union
 from math import isnan
-from construct import Adapter, Array, BytesInteger, Construct
+from construct import Adapter, BytesInteger, Construct, Container, ListContainer
 from construct import singleton  # type: ignore
 from construct import FormatField, FormatFieldError, GreedyBytes, IfThenElse
 from construct import Int8ul as U8
 from construct import Int32ul as U32
-from construct import Pass, Prefixed, PrefixedArray
-from construct import Sequence
+from construct import FocusedSeq, Pass, Prefixed, RangeError, Switch
+from construct import Sequence, SizeofError, StreamError, Subconstruct
+from construct import stream_read
 from construct import Struct
 
+from .buffer import BufferStream, LazyString
+
 TUPLE_DATA = "tuple_data"
 
 NAMED_TUPLE_FIELD_ERROR = ValueError("TupleStruct cannot have named fields")
@@ -42,6 +48,38 @@ class CStruct(Struct):
         for subcon in subcons:
             check_subcon_name(subcon.name)
 
+    def offset_of(self, buf: Any, name: str) -> int:
+        """Return the offset of a field in an encoded struct.
+
+        Args:
+            buf (Any): the encoded struct, as a bytes-like object.
+            name (str): the field name, with dots for nested structs.
+
+        Returns:
+            int: the offset of the field in `buf`.
+        """
+        return _layout().offset_of(self, buf, name)
+
+    def patch(self, buf: Any, name: str, value: Any) -> None:
+        """Overwrite a fixed-size field of an encoded struct in place.
+
+        Only the field is encoded. Variable-size fields before it are skipped
+        without being decoded, as far as possible.
+
+        Args:
+            buf (Any): the encoded struct, as a writable buffer such as a bytearray.
+            name (str): the field name, with dots for nested structs.
+            value (Any): the new value of the field.
+        """
+        _layout().patch(self, buf, name, value)
+
+
+def _layout() -> Any:
+    # Imported late, since the layout module builds on this one.
+    from . import layout  # noqa: WPS433
+
+    return layout
+
 
 def _check_name_not_null(name: Optional[str]) -> None:
     if name is None:
@@ -74,6 +112,65 @@ class FormatFieldNoNan(FormatField):
         return super()._build(obj, stream, context, path)
 
 
+_SUBCON_ATTRIBUTES = (
+    "subcon",
+    "lengthfield",
+    "thensubcon",
+    "elsesubcon",
+    "default",
+    "struct",
+)
+
+
+def trusted(subcon: Construct) -> Construct:
+    """Return a copy of a type that skips per-value validation.
+
+    The copy parses and builds valid data exactly like the original,
+    but it no longer rejects nan floats. Only use it for data you produced
+    yourself. The original type is left unchanged.
+
+    Args:
+        subcon (Construct): the type to copy.
+
+    Returns:
+        Construct: the unvalidated copy.
+    """
+    return _trusted_copy(subcon, {})
+
+
+def _trusted_copy(subcon: Construct, memo: Dict[int, Construct]) -> Construct:
+    try:
+        return memo[id(subcon)]
+    except KeyError:
+        memo[id(subcon)] = _trusted_replacement(subcon, memo)
+    return memo[id(subcon)]
+
+
+def _trusted_replacement(subcon: Construct, memo: Dict[int, Construct]) -> Construct:
+    if isinstance(subcon, FormatFieldNoNan):
+        return FormatField(subcon.fmtstr[0], subcon.fmtstr[1])
+    replacement = copy(subcon)
+    for attribute in _SUBCON_ATTRIBUTES:
+        child = getattr(subcon, attribute, None)
+        if isinstance(child, Construct):
+            setattr(replacement, attribute, _trusted_copy(child, memo))
+    if isinstance(replacement, (Struct, Sequence, FocusedSeq)):
+        _trusted_subcons(replacement, memo)
+    elif isinstance(replacement, Switch):
+        replacement.cases = {
+            key: _trusted_copy(case, memo)
+            for key, case in replacement.cases.items()
+        }
+    return replacement
+
+
+def _trusted_subcons(replacement: Any, memo: Dict[int, Construct]) -> None:
+    subcons = [_trusted_copy(sc, memo) for sc in replacement.subcons]
+    replacement.subcons = subcons
+    named = [(sc.name, sc) for sc in subcons if sc.name]
+    replacement._subcons = Container(named)  # noqa: WPS437
+
+
 @singleton
 def F32() -> FormatFieldNoNan:  # noqa: N802
     """Little endian, 32-bit IEEE floating point number."""
@@ -86,29 +183,239 @@ def F64() -> FormatFieldNoNan:  # noqa: N802
     return FormatFieldNoNan("<", "d")
 
 
-def Vec(subcon: Construct) -> Array:  # noqa: N802
+# Lists read from a stream of unknown size start at most this long.
+_PREALLOCATED_ITEMS = 4096
+_READ_CHUNK_SIZE = 1 << 20
+_STREAM_END_KEY = "_borsh_stream_end"
+
+
+class _DefaultLimits(object):
+    max_length: Optional[int] = None
+
+
+def set_max_length(max_length: Optional[int]) -> None:
+    """Set the default maximum length of all length-prefixed types.
+
+    The limit applies to the number of items in a `Vec`, `HashMap` or `HashSet`
+    and to the number of bytes in `Bytes` and `String`, unless the type was
+    given its own `max_length`. `None` (the default) means no limit.
+
+    Args:
+        max_length (Optional[int]): the new default limit.
+    """
+    _DefaultLimits.max_length = max_length
+
+
+def _stream_end(stream) -> Optional[int]:
+    try:
+        position = stream.tell()
+    except (AttributeError, OSError):
+        return None
+    try:
+        end = stream.seek(0, SEEK_END)
+    except (OSError, ValueError):
+        return None
+    stream.seek(position)
+    return end
+
+
+def stream_remaining(stream, context: Optional[Container] = None) -> Optional[int]:
+    """Return the number of bytes left in a stream, or None if it is unknown.
+
+    Args:
+        stream: the stream being parsed.
+        context (Optional[Container]): the parsing context, to look the size up once.
+
+    Returns:
+        Optional[int]: the bytes left after the current position.
+    """
+    if isinstance(stream, BufferStream):
+        return len(stream.view) - stream.position
+    if isinstance(stream, BytesIO):
+        with stream.getbuffer() as buffer:
+            return buffer.nbytes - stream.tell()
+    # Seeking to the end throws away the read buffer of a file,
+    # so the end is only looked up once per top-level parse.
+    params = {} if context is None else context.get("_params", context)
+    known = params.get(_STREAM_END_KEY)
+    if known is None or known[0] is not stream:
+        known = (stream, _stream_end(stream))
+        params[_STREAM_END_KEY] = known
+    return None if known[1] is None else known[1] - stream.tell()
+
+
+def check_length(
+    length: int,
+    max_length: Optional[int],
+    min_item_size: int,
+    remaining: Optional[int],
+    path: str,
+) -> None:
+    """Check a length prefix before anything is allocated for it.
+
+    Args:
+        length (int): the length read from the prefix.
+        max_length (Optional[int]): the limit of the type, if it has one.
+        min_item_size (int): a lower bound on the size of one item.
+        remaining (Optional[int]): the bytes left to read them from, if known.
+        path (str): the construct path, for error messages.
+
+    Raises:
+        RangeError: the length exceeds the limit.
+        StreamError: the stream is too short to hold the items.
+    """
+    limit = _DefaultLimits.max_length if max_length is None else max_length
+    if limit is not None and length > limit:
+        raise RangeError(f"length {length} exceeds the limit of {limit}", path=path)
+    needed = length * min_item_size
+    if remaining is not None and needed > remaining:
+        raise StreamError(
+            f"length {length} needs at least {needed} bytes, found {remaining}",
+            path=path,
+        )
+
+
+def read_exact(stream, size: int, path: str, context: Container) -> bytes:
+    """Read exactly `size` bytes, without trusting `size` if the stream size is unknown.
+
+    Args:
+        stream: the stream to read from.
+        size (int): the number of bytes to read.
+        path (str): the construct path, for error messages.
+        context (Container): the parsing context.
+
+    Returns:
+        bytes: the bytes read.
+
+    Raises:
+        StreamError: the stream ended early.
+    """
+    if size <= _READ_CHUNK_SIZE or stream_remaining(stream, context) is not None:
+        return stream_read(stream, size, path)
+    # A bad length on a pipe or socket must not allocate more than was sent.
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(min(size - len(data), _READ_CHUNK_SIZE))
+        if not chunk:
+            raise StreamError(
+                f"stream read less than specified amount, expected {size}",
+                path=path,
+            )
+        data += chunk
+    return bytes(data)
+
+
+def _check_zero_size_items(count: int, max_length: Optional[int], path: str) -> None:
+    # Zero-size items take no input, so the stream size cannot bound their
+    # count. Like borsh-rs, refuse them unless a limit does.
+    limit = _DefaultLimits.max_length if max_length is None else max_length
+    if count and limit is None:
+        raise RangeError(
+            f"length {count} of zero-size items needs a max_length",
+            path=path,
+        )
+
+
+def _min_sizeof(subcon: Construct) -> int:
+    try:
+        return subcon.sizeof()
+    except SizeofError:
+        # Every variable-sized Borsh type takes at least one byte.
+        return 1
+
+
+class _PrefixedArray(Subconstruct):
+    """`construct.PrefixedArray` with a U32 count that is checked before use."""
+
+    def __init__(self, subcon: Construct, max_length: Optional[int] = None) -> None:
+        super().__init__(subcon)  # type: ignore
+        self.max_length = max_length
+        self.min_item_size = _min_sizeof(subcon)
+
+    def _parse(self, stream, context, path):
+        count = U32.parse_stream(stream)
+        if not self.min_item_size:
+            _check_zero_size_items(count, self.max_length, path)
+        remaining = stream_remaining(stream, context)
+        check_length(count, self.max_length, self.min_item_size, remaining, path)
+        # The count may still be wrong if the stream size is unknown, so only
+        # the first items are preallocated and the list doubles from there.
+        items = ListContainer(repeat(None, min(count, _PREALLOCATED_ITEMS)))
+        parse_item = self.subcon._parsereport  # noqa: WPS437
+        for idx in range(count):
+            if idx == len(items):
+                items.extend(repeat(None, min(idx, count - idx)))
+            context["_index"] = idx
+            items[idx] = parse_item(stream, context, path)
+        return items
+
+    def _build(self, obj, stream, context, path):
+        count = len(obj)
+        check_length(count, self.max_length, 0, None, path)
+        U32.build_stream(count, stream)
+        build_item = self.subcon._build  # noqa: WPS437
+        for idx, item in enumerate(obj):
+            context["_index"] = idx
+            build_item(item, stream, context, path)
+        return obj
+
+    def _sizeof(self, context, path):
+        raise SizeofError("Vec has no fixed size.", path=path)
+
+
+def Vec(  # noqa: N802
+    subcon: Construct,
+    max_length: Optional[int] = None,
+) -> Construct:
     """Dynamic sized array.
 
     Args:
         subcon (Construct): the type of the array members.
+        max_length (Optional[int]): the maximum number of members.
 
     Returns:
-        Array: a Construct PrefixedArray.
+        Construct: a Construct PrefixedArray.
     """
-    return PrefixedArray(U32, subcon)
+    return _PrefixedArray(subcon, max_length)
 
 
-Bytes = Prefixed(U32, GreedyBytes)
+class _Bytes(Prefixed):
+    def __init__(self) -> None:
+        super().__init__(U32, GreedyBytes)
+
+    def _parse(self, stream, context, path):
+        length = self.lengthfield._parsereport(  # noqa: WPS437
+            stream,
+            context,
+            path,
+        )
+        check_length(length, None, 1, stream_remaining(stream, context), path)
+        if isinstance(stream, BufferStream):
+            return stream.read_view(length)
+        return read_exact(stream, length, path, context)
+
+    def _build(self, obj, stream, context, path):
+        check_length(len(obj), None, 0, None, path)
+        if isinstance(obj, memoryview):
+            return super()._build(obj.tobytes(), stream, context, path)
+        return super()._build(obj, stream, context, path)
+
+
+Bytes = _Bytes()
 
 
 class _String(Adapter):
     def __init__(self) -> None:
         super().__init__(Bytes)  # type: ignore
 
-    def _decode(self, obj: bytes, context, path) -> str:
+    def _decode(self, obj: Union[bytes, memoryview], context, path) -> Any:
+        if isinstance(obj, memoryview):
+            return LazyString(obj)
         return obj.decode("utf8")
 
-    def _encode(self, obj: str, context, path) -> bytes:
+    def _encode(self, obj: Union[str, LazyString], context, path) -> Any:
+        if isinstance(obj, LazyString):
+            return obj.view
         return bytes(obj, "utf8")
 
 
@@ -140,12 +447,28 @@ class Option(Adapter):
 class HashMap(Adapter):
     """Borsh implementation for Rust HashMap."""
 
-    def __init__(self, key_subcon: Construct, value_subcon: Construct) -> None:
+    def __init__(
+        self,
+        key_subcon: Construct,
+        value_subcon: Construct,
+        max_length: Optional[int] = None,
+    ) -> None:
+        """Init HashMap.
+
+        Args:
+            key_subcon (Construct): the type of the keys.
+            value_subcon (Construct): the type of the values.
+            max_length (Optional[int]): the maximum number of entries.
+        """
         super().__init__(
-            PrefixedArray(U32, TupleStruct(key_subcon, value_subcon)),
+            _PrefixedArray(TupleStruct(key_subcon, value_subcon), max_length),
         )  # type: ignore
+        self.bytes_keys = key_subcon is Bytes
 
     def _decode(self, obj: List[Tuple[Any, Any]], context, path) -> dict:
+        if self.bytes_keys:
+            # Zero-copy views over a bytearray or mmap cannot be hashed.
+            return {bytes(key): value for key, value in obj}
         return dict(obj)
 
     def _encode(self, obj, context, path) -> List[Tuple]:
@@ -155,10 +478,19 @@ class HashMap(Adapter):
 class HashSet(Adapter):
     """Python implementation of Rust HashSet."""
 
-    def __init__(self, subcon: Construct) -> None:
-        super().__init__(PrefixedArray(U32, subcon))  # type: ignore
+    def __init__(self, subcon: Construct, max_length: Optional[int] = None) -> None:
+        """Init HashSet.
+
+        Args:
+            subcon (Construct): the type of the members.
+            max_length (Optional[int]): the maximum number of members.
+        """
+        super().__init__(_PrefixedArray(subcon, max_length))  # type: ignore
+        self.bytes_members = subcon is Bytes
 
     def _decode(self, obj, context, path) -> set:
+        if self.bytes_members:
+            return set(map(bytes, obj))
         return set(obj)
 
     def _encode(self, obj, context, path) -> list:
@@ -1,14 +1,19 @@
 from __future__ import annotations
+from copy import deepcopy
+from threading import Lock
+from functools import cached_property
 from typing import List, Tuple, Union, cast, Any, Dict
+from typing import Callable, Iterable, Mapping, Optional
 from sumtypes import sumtype, constructor
 from construct import Pass, Renamed, Adapter, Switch, Container, Construct
+from construct import MappingError, StreamError
 import attr
 
 from .core import CStruct, TupleStruct, U8, TUPLE_DATA, check_subcon_name
 
 
-def _rust_enum(klass):
-    indexed = sumtype(klass)
+def _rust_enum(klass, frozen=False):
+    indexed = sumtype(frozen=True)(klass) if frozen else sumtype(klass)
     for idx, cname in enumerate(indexed._sumtype_constructor_names):  # noqa: WPS437
         constructr = getattr(indexed, cname)
         constructr.index = idx
@@ -23,39 +28,111 @@ def _rust_enum(klass):
     return indexed
 
 
-def _tuple_struct():
-    return constructor(**{TUPLE_DATA: attr.ib(type=tuple)})
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> None:
+    raise TypeError("Fields of frozen enum variants are read-only.")
+
+
+class FrozenDict(dict):  # noqa: WPS600
+    """A hashable, read-only dict, for `HashMap` fields of frozen variants."""
+
+    _mapping: Any = dict
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only  # type: ignore
+    setdefault = _read_only
+    update = _read_only
+
+    def __init__(self, items: Iterable[Tuple[Any, Any]] = ()) -> None:
+        """Fill the mapping once, past the blocked `__setitem__`."""  # noqa: DAR101
+        for key, field in items:
+            self._mapping.__setitem__(self, key, field)  # noqa: WPS609
+
+    def __hash__(self) -> int:  # type: ignore
+        """Hash the items."""
+        return hash(frozenset(self.items()))
+
+    def __copy__(self) -> "FrozenDict":
+        """Return self, since it cannot change."""
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenDict":
+        """Copy the items, without calling the blocked `__setitem__`."""  # noqa: DAR101
+        return type(self)(deepcopy(list(self.items()), memo))
+
+
+class FrozenContainer(FrozenDict, Container):
+    """A hashable, read-only `Container`, for struct fields of frozen variants."""
+
+    _mapping = Container
+
+    def __hash__(self) -> int:  # type: ignore
+        """Hash the items compared by `==`, which skips names starting with _."""
+        return hash(frozenset(_public_items(self)))
+
+
+def _public_items(container: Container) -> Iterable[Tuple[Any, Any]]:
+    return (item for item in container.items() if not str(item[0]).startswith("_"))
+
+
+def _freeze(obj: Any) -> Any:
+    # Lists, sets and mappings become immutable, so that frozen variants hash.
+    if isinstance(obj, Container):
+        return FrozenContainer(
+            (key, _freeze(field)) for key, field in _public_items(obj)
+        )
+    if isinstance(obj, dict):
+        return FrozenDict((key, _freeze(field)) for key, field in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(map(_freeze, obj))
+    if isinstance(obj, set):
+        return frozenset(obj)
+    return obj
+
+
+def _field(frozen: bool) -> Any:
+    return attr.ib(converter=_freeze) if frozen else attr.ib()
+
+
+def _tuple_struct(frozen: bool):
+    return constructor(**{TUPLE_DATA: _field(frozen)})
 
 
 def _unit_struct():
     return constructor()
 
 
-def _clike_struct(*fields: str):
-    return constructor(*fields)
+def _clike_struct(fields: List[str], frozen: bool):
+    return constructor(**{field: _field(frozen) for field in fields})
 
 
-def _handle_cstruct_variant(underlying_variant, variant_name) -> Tuple[str, Any]:
+def _handle_cstruct_variant(
+    underlying_variant,
+    variant_name,
+    frozen: bool,
+) -> Tuple[str, Any]:
     subcon_names: List[str] = []
     for s in underlying_variant.subcons:
         name = s.name
         subcon_names.append(cast(str, name))
-    return variant_name, _clike_struct(*subcon_names)
+    return variant_name, _clike_struct(subcon_names, frozen)
 
 
-def _handle_struct_variant(variant) -> Tuple[str, Any]:
+def _handle_struct_variant(variant, frozen: bool) -> Tuple[str, Any]:
     variant_name = variant.name
     check_subcon_name(variant_name)
     underlying_variant = variant.subcon if isinstance(variant, Renamed) else variant
     if isinstance(underlying_variant, TupleStruct):
-        return variant_name, _tuple_struct()
+        return variant_name, _tuple_struct(frozen)
     elif isinstance(underlying_variant, CStruct):
-        return _handle_cstruct_variant(underlying_variant, variant_name)
+        return _handle_cstruct_variant(underlying_variant, variant_name, frozen)
     variant_type = type(underlying_variant)
     raise ValueError(f"Unrecognized variant type: {variant_type}")
 
 
-def _make_cls_dict(*variants) -> dict:  # noqa: WPS210
+def _make_cls_dict(variants: tuple, frozen: bool) -> dict:  # noqa: WPS210
     result = {"__doc__": "Python representation of Rust's Enum type."}
     seen_variant_names = set()
     for variant in variants:
@@ -64,7 +141,7 @@ def _make_cls_dict(*variants) -> dict:  # noqa: WPS210
             result[variant] = _unit_struct()
         else:
             variant_name = variant.name
-            key, val = _handle_struct_variant(variant)
+            key, val = _handle_struct_variant(variant, frozen)
             result[key] = val
         if variant_name in seen_variant_names:
             raise ValueError("Enum variant names must be unique.")
@@ -72,9 +149,38 @@ def _make_cls_dict(*variants) -> dict:  # noqa: WPS210
     return result
 
 
-def _make_enum(*variants, name: str):
-    klass = type(name, (object,), _make_cls_dict(*variants))
-    return _rust_enum(klass)
+class _LazyEnum(object):
+    """Create the Python class of an enum on first use.
+
+    Creating the attrs classes of the variants is by far the slowest part of
+    defining an Enum, and many enums of a large schema are never used.
+    """
+
+    def __init__(self, variants: tuple, name: str, frozen: bool) -> None:
+        self.cls_dict = _make_cls_dict(variants, frozen)
+        self.name = name
+        self.frozen = frozen
+        self.klass: Any = None
+        self.lock = Lock()
+
+    def get(self) -> Any:
+        klass = self.klass
+        if klass is not None:
+            return klass
+        with self.lock:
+            if self.klass is None:
+                klass = type(self.name, (object,), self.cls_dict)
+                self.klass = _rust_enum(klass, frozen=self.frozen)
+            return self.klass
+
+
+@attr.s(frozen=True, slots=True)
+class VariantPeek(object):
+    """The variant of an encoded enum, as returned by `Enum.peek_variant`."""
+
+    name: str = attr.ib()
+    index: int = attr.ib()
+    body: memoryview = attr.ib()
 
 
 class Enum(Adapter):
@@ -83,12 +189,22 @@ class Enum(Adapter):
     _index_key = "index"
     _value_key = "value"
 
-    def __init__(self, *variants: Union[str, Construct], enum_name: str) -> None:
+    def __init__(
+        self,
+        *variants: Union[str, Construct],
+        enum_name: str,
+        frozen: bool = False,
+    ) -> None:
         """Init enum.
 
         Note: unlike other types, you must use the `enum_name` keyword argument
         to give your Enum a name when instantiating it.
-        """  # noqa: DAR101
+
+        Args:
+            variants (Union[str, Construct]): the variants of the enum.
+            enum_name (str): the name of the Python class for the enum.
+            frozen (bool): if True, variants are hashable, with read-only fields.
+        """
         switch_cases = {}
         for idx, var in enumerate(variants):
             if isinstance(var, str):
@@ -103,7 +219,37 @@ class Enum(Adapter):
         super().__init__(enum_struct)  # type: ignore
         self.variants = variants
         self.enum_name = enum_name
-        self.enum = _make_enum(*variants, name=enum_name)
+        self.variant_names: Tuple[str, ...] = tuple(
+            var if isinstance(var, str) else str(var.name) for var in variants
+        )
+        self._lazy_enum = _LazyEnum(variants, enum_name, frozen)
+
+    @property
+    def enum(self) -> Any:
+        """The Python class of the enum, with one constructor per variant."""
+        return self._lazy_enum.get()
+
+    def peek_variant(self, data: Any) -> VariantPeek:
+        """Read which variant an encoded enum holds, without decoding it.
+
+        Args:
+            data (Any): a bytes-like object starting with the encoded enum.
+
+        Returns:
+            VariantPeek: the variant name and index, and a zero-copy view
+                of everything after the index.
+
+        Raises:
+            StreamError: data is empty.
+            MappingError: the index does not match any variant.
+        """
+        view = memoryview(data).cast("B")
+        if not view:
+            raise StreamError("cannot read the variant index of empty data")
+        index = view[0]
+        if index >= len(self.variant_names):
+            raise MappingError(f"no variant with index {index}")
+        return VariantPeek(self.variant_names[index], index, view[1:])
 
     def _decode(self, obj: Any, context, path) -> Any:
         index = obj.index
@@ -126,3 +272,66 @@ class Enum(Adapter):
         else:
             to_build = None
         return {self._index_key: index, self._value_key: to_build}
+
+
+class LazyVariant(object):
+    """An encoded enum whose variant is known but whose body is decoded on use."""
+
+    def __init__(self, enum_type: Enum, data: Any, peek: VariantPeek) -> None:
+        """Init LazyVariant.
+
+        Args:
+            enum_type (Enum): the type of the enum.
+            data (Any): the encoded enum.
+            peek (VariantPeek): the result of `enum_type.peek_variant(data)`.
+        """
+        self.enum_type = enum_type
+        self.data = data
+        self.name = peek.name
+        self.index = peek.index
+        self.body = peek.body
+
+    @cached_property
+    def value(self) -> Any:
+        """The decoded enum, as `enum_type.parse` would return it."""
+        return self.enum_type.parse(self.data)
+
+
+_Handler = Callable[[LazyVariant], Any]
+
+
+class Dispatcher(object):
+    """Route encoded enums to a handler per variant.
+
+    Only the variant index is read to pick the handler. The handler gets a
+    `LazyVariant`, so handlers that just forward `body` never decode it.
+    """
+
+    def __init__(
+        self,
+        enum_type: Enum,
+        handlers: Mapping[str, _Handler],
+        default: Optional[_Handler] = None,
+    ) -> None:
+        """Init Dispatcher.
+
+        Args:
+            enum_type (Enum): the type of the messages.
+            handlers (Mapping[str, _Handler]): the handlers, by variant name.
+            default (Optional[_Handler]): the handler of the other variants.
+        """
+        unknown = sorted(set(handlers) - set(enum_type.variant_names))
+        if unknown:
+            raise ValueError(f"Handlers for unknown variants: {unknown}")
+        self.enum_type = enum_type
+        self.handlers: List[Optional[_Handler]] = [
+            handlers.get(name, default) for name in enum_type.variant_names
+        ]
+
+    def __call__(self, data: Any) -> Any:
+        """Route one encoded enum and return the handler's result."""  # noqa: DAR101
+        peek = self.enum_type.peek_variant(data)
+        handler = self.handlers[peek.index]
+        if handler is None:
+            raise KeyError(f"No handler for variant {peek.name}")
+        return handler(LazyVariant(self.enum_type, data, peek))
@@ -0,0 +1,352 @@
+from bisect import bisect_left, bisect_right
+from collections import abc
+from functools import lru_cache
+from io import SEEK_CUR
+from typing import Any, Callable, Optional, Tuple, Union, cast
+from construct import Construct, Container, IfThenElse, ListContainer, Renamed
+from construct import SizeofError
+from construct import StreamError, Struct, Subconstruct, Switch, evaluate
+from construct import Sequence as ConstructSequence
+
+from .buffer import BufferStream
+from .core import U32, check_length, stream_remaining
+from .core import _Bytes, _PrefixedArray  # noqa: WPS450
+from .enum import Enum
+
+# Named fixed-size fields up to this size are read while skipping a struct
+# that has Switch or IfThenElse fields, since those may depend on them.
+_CONTEXT_FIELD_SIZE = 16
+
+
+@lru_cache(maxsize=1024)
+def static_size(subcon: Construct) -> Optional[int]:
+    """Return the encoded size of a type, or None if it is variable.
+
+    Args:
+        subcon (Construct): the type to measure.
+
+    Returns:
+        Optional[int]: the size in bytes, if every value has the same size.
+    """
+    try:
+        return subcon.sizeof()
+    except (SizeofError, KeyError, AttributeError):
+        # Sizes that depend on other fields are variable too.
+        return None
+
+
+def _parse_context(stream: BufferStream) -> "Container[Any]":
+    context: "Container[Any]" = Container(
+        _parsing=True,
+        _building=False,
+        _sizing=False,
+        _io=stream,
+    )
+    context["_params"] = context
+    return context
+
+
+def _child_context(context: "Container[Any]") -> "Container[Any]":
+    return Container(
+        _=context,
+        _params=context["_params"],
+        _parsing=True,
+        _building=False,
+        _sizing=False,
+        _io=context["_io"],
+    )
+
+
+def _advance(stream: BufferStream, size: int, path: str) -> None:
+    if stream.seek(size, SEEK_CUR) > len(stream.view):
+        raise StreamError(
+            f"stream read less than specified amount, expected {size}",
+            path=path,
+        )
+
+
+@lru_cache(maxsize=1024)
+def _needs_context(struct: Any) -> bool:
+    return any(
+        isinstance(_unrename(field), (Switch, IfThenElse)) for field in struct.subcons
+    )
+
+
+def _unrename(subcon: Construct) -> Construct:
+    while isinstance(subcon, Renamed):
+        subcon = subcon.subcon  # type: ignore
+    return subcon
+
+
+def _skip(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    size = static_size(subcon)
+    if size is not None:
+        _advance(stream, size, path)
+        return
+    for subcon_type, skipper in _SKIPPERS:
+        if isinstance(subcon, subcon_type):
+            skipper(subcon, stream, context, path)
+            return
+    subcon._parsereport(stream, context, path)  # noqa: WPS437
+
+
+def _skip_bytes(subcon: Construct, stream: BufferStream, context, path: str) -> None:
+    _advance(stream, U32.parse_stream(stream), path)  # type: ignore
+
+
+def _skip_array(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    count = U32.parse_stream(stream)  # type: ignore
+    remaining = stream_remaining(stream)
+    check_length(count, subcon.max_length, subcon.min_item_size, remaining, path)
+    item_size = static_size(subcon.subcon)
+    if item_size is not None:
+        _advance(stream, count * item_size, path)
+        return
+    for idx in range(count):
+        context["_index"] = idx
+        _skip(subcon.subcon, stream, context, path)
+
+
+def _skip_struct(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    _skip_fields(subcon, None, stream, _child_context(context), path)
+
+
+def _skip_fields(
+    struct: Any,
+    name: Optional[str],
+    stream: BufferStream,
+    context,
+    path: str,
+) -> Optional[Construct]:
+    needs_context = _needs_context(struct)
+    for field in struct.subcons:
+        if name is not None and field.name == name:
+            return field
+        size = static_size(field)
+        if needs_context and field.name and size and size <= _CONTEXT_FIELD_SIZE:
+            parse_field = field._parsereport  # noqa: WPS437
+            context[field.name] = parse_field(stream, context, path)
+        else:
+            _skip(field, stream, context, path)
+    return None
+
+
+def _skip_switch(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    case = subcon.cases.get(evaluate(subcon.keyfunc, context), subcon.default)
+    _skip(case, stream, context, path)
+
+
+def _skip_enum(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    # The Switch of an Enum falls back to Pass, so check the index first.
+    subcon.peek_variant(stream.view[stream.tell():])
+    _skip_inner(subcon, stream, context, path)
+
+
+def _skip_if(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    if evaluate(subcon.condfunc, context):
+        chosen = subcon.thensubcon
+    else:
+        chosen = subcon.elsesubcon
+    _skip(chosen, stream, context, path)
+
+
+def _skip_inner(subcon: Any, stream: BufferStream, context, path: str) -> None:
+    _skip(subcon.subcon, stream, context, path)
+
+
+_Skipper = Callable[..., None]
+_SKIPPERS: Tuple[Tuple[type, _Skipper], ...] = (
+    (_Bytes, _skip_bytes),
+    (_PrefixedArray, _skip_array),
+    (Struct, _skip_struct),
+    (ConstructSequence, _skip_struct),
+    (Switch, _skip_switch),
+    (IfThenElse, _skip_if),
+    (Enum, _skip_enum),
+    (Subconstruct, _skip_inner),
+)
+
+
+def _find(struct: Construct, name: str, stream: BufferStream) -> Construct:
+    context = _parse_context(stream)
+    field = struct
+    for part in name.split("."):
+        inner = _unrename(field)
+        if not isinstance(inner, Struct):
+            raise KeyError(f"{name}: {field} is not a CStruct")
+        context = _child_context(context)
+        field = _skip_fields(inner, part, stream, context, name)  # type: ignore
+        if field is None:
+            raise KeyError(name)
+    return field
+
+
+def offset_of(struct: Construct, buf: Any, name: str) -> int:
+    """Return the offset of a field in an encoded struct.
+
+    Fixed-size fields before it are stepped over without reading the buffer.
+    Variable-size fields are skipped by reading only their length prefixes
+    and tags, as far as possible.
+
+    Args:
+        struct (Construct): a `CStruct` type.
+        buf (Any): the encoded struct, as a bytes-like object.
+        name (str): the field name, with dots for nested structs (`"header.nonce"`).
+
+    Returns:
+        int: the offset of the field in `buf`.
+    """
+    stream = BufferStream(buf)
+    _find(struct, name, stream)
+    return stream.tell()
+
+
+def patch(struct: Construct, buf: Any, name: str, value: Any) -> None:
+    """Overwrite a fixed-size field of an encoded struct in place.
+
+    Only the field is encoded and written, the rest of `buf` is not
+    parsed or copied.
+
+    Args:
+        struct (Construct): a `CStruct` type.
+        buf (Any): the encoded struct, as a writable buffer such as a bytearray.
+        name (str): the field name, as for `offset_of`.
+        value (Any): the new value of the field.
+
+    Raises:
+        TypeError: the buffer is read-only.
+        ValueError: the field does not have a fixed size.
+    """
+    target = memoryview(buf).cast("B")
+    if target.readonly:
+        raise TypeError("patch needs a writable buffer, such as a bytearray.")
+    stream = BufferStream(buf)
+    field = _find(struct, name, stream)
+    size = static_size(field)
+    if size is None:
+        raise ValueError(f"Only fixed-size fields can be patched, {name} is not.")
+    start = stream.tell()
+    _advance(stream, size, name)
+    target[start:stream.tell()] = field.build(value)  # noqa: WPS362
+
+
+def _key_field(item: Construct, key: Union[str, int, None]) -> Tuple[int, Construct]:
+    inner = _unrename(item)
+    if key is None:
+        if isinstance(inner, Struct):
+            raise TypeError("CStruct items cannot be compared whole, pass a key.")
+        return 0, item
+    offset = 0
+    for idx, field in enumerate(getattr(inner, "subcons", ())):
+        if key in {idx, field.name}:
+            return offset, field
+        offset += static_size(field)  # type: ignore
+    raise KeyError(key)
+
+
+class _Keys(abc.Sequence):
+    def __init__(self, vec_view: "VecView", key: Union[str, int, None]) -> None:
+        self.vec_view = vec_view
+        key_field = _key_field(vec_view.item, key)
+        self.offset = key_field[0]
+        self.field = key_field[1]
+        # The items have a fixed size, so their fields do too.
+        self.size = cast(int, static_size(self.field))
+
+    def __len__(self) -> int:
+        return len(self.vec_view)
+
+    def __getitem__(self, index: Any) -> Any:
+        start = self.vec_view.item_offset(index) + self.offset
+        encoded = self.vec_view.view[start:start + self.size]
+        return self.field.parse(encoded)  # type: ignore
+
+
+class VecView(abc.Sequence):
+    """A read-only sequence over an encoded `Vec` of fixed-size items.
+
+    Item *i* is found at a known offset, so only the items that are used are
+    decoded. Slicing returns a list of decoded items.
+    """
+
+    def __init__(self, vec_type: Construct, buf: Any, offset: int = 0) -> None:
+        """Init VecView.
+
+        Args:
+            vec_type (Construct): the `Vec` type. Its items must have a fixed size.
+            buf (Any): a bytes-like object holding the encoded `Vec`.
+            offset (int): where the `Vec` starts in `buf`, see `CStruct.offset_of`.
+        """
+        if not isinstance(vec_type, _PrefixedArray):
+            raise TypeError(f"Expected a Vec, found {vec_type}")
+        item_size = static_size(vec_type.subcon)
+        if not item_size:
+            raise ValueError("VecView needs items with a fixed, non-zero size.")
+        stream = BufferStream(buf)
+        stream.seek(offset)
+        self.length = U32.parse_stream(stream)  # type: ignore
+        remaining = stream_remaining(stream)
+        check_length(self.length, vec_type.max_length, item_size, remaining, "(view)")
+        self.item = vec_type.subcon
+        self.item_size = item_size
+        self.view = stream.view
+        self.start = stream.tell()
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return self.length
+
+    def __getitem__(self, index: Any) -> Any:
+        """Decode one item, or a list of items for a slice."""  # noqa: DAR101
+        if isinstance(index, slice):
+            return ListContainer(
+                self[idx] for idx in range(*index.indices(self.length))
+            )
+        start = self.item_offset(index)
+        return self.item.parse(self.view[start:start + self.item_size])  # type: ignore
+
+    def item_offset(self, index: int) -> int:
+        """Return the offset of an item in the buffer.
+
+        Args:
+            index (int): the item index. Negative indices count from the end.
+
+        Returns:
+            int: the offset of the item.
+
+        Raises:
+            IndexError: the index is out of range.
+        """
+        position = index + self.length if index < 0 else index
+        if position < 0 or position >= self.length:
+            raise IndexError("VecView index out of range")
+        return self.start + position * self.item_size
+
+    def bisect_left(self, value: Any, key: Union[str, int, None] = None) -> int:
+        """Find where `value` would be inserted, before any equal items.
+
+        The items must be sorted by `key`, a `CStruct` field name or
+        a `TupleStruct` index. None compares whole numbers or `TupleStruct`
+        items (with `value` as a list). It raises TypeError for `CStruct` items.
+        Only about log2(n) keys are decoded.
+
+        Args:
+            value (Any): the key value to look for.
+            key (Union[str, int, None]): the item field to compare, if any.
+
+        Returns:
+            int: the insertion index, as for `bisect.bisect_left`.
+        """
+        return bisect_left(_Keys(self, key), value)
+
+    def bisect_right(self, value: Any, key: Union[str, int, None] = None) -> int:
+        """Like `bisect_left`, but after any equal items.
+
+        Args:
+            value (Any): the key value to look for.
+            key (Union[str, int, None]): as for `bisect_left`.
+
+        Returns:
+            int: the insertion index, as for `bisect.bisect_right`.
+        """
+        return bisect_right(_Keys(self, key), value)
@@ -0,0 +1,225 @@
+import json
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Set, Union
+from construct import Construct
+
+import borsh_construct as borsh
+
+_PRIMITIVES = MappingProxyType(
+    {
+        "bool": "Bool",
+        "u8": "U8",
+        "i8": "I8",
+        "u16": "U16",
+        "i16": "I16",
+        "u32": "U32",
+        "i32": "I32",
+        "u64": "U64",
+        "i64": "I64",
+        "u128": "U128",
+        "i128": "I128",
+        "f32": "F32",
+        "f64": "F64",
+        "string": "String",
+        "bytes": "Bytes",
+    },
+)
+_ALIASES = MappingProxyType(
+    {"publicKey": {"array": ["u8", 32]}, "pubkey": {"array": ["u8", 32]}},
+)
+_WRAPPERS = MappingProxyType({"vec": "Vec", "option": "Option", "hashSet": "HashSet"})
+_HEADER = """# Generated by borsh_construct.schema, do not edit.
+import borsh_construct as borsh
+
+TYPES = dict()
+"""
+
+
+def _resolve(type_def: Any) -> Any:
+    # Aliases like publicKey stand for other types.
+    if isinstance(type_def, str):
+        return _ALIASES.get(type_def, type_def)
+    return type_def
+
+
+class _Types(object):
+    """Creates the Borsh types themselves."""
+
+    def __init__(self) -> None:
+        self.types: Dict[str, Construct] = {}
+
+    def primitive(self, name: str) -> Construct:
+        return getattr(borsh, name)
+
+    def call(self, func: str, args: Iterable[Any], **kwargs: Any) -> Construct:
+        return getattr(borsh, func)(*args, **kwargs)
+
+    def renamed(self, name: str, subcon: Construct) -> Construct:
+        return name / subcon
+
+    def array(self, item: Construct, length: int) -> Construct:
+        return item[length]
+
+    def literal(self, literal: str) -> str:
+        return literal
+
+    def define(self, name: str, subcon: Construct) -> Construct:
+        self.types[name] = subcon
+        return subcon
+
+
+class _Source(object):
+    """Writes the Python source that creates the Borsh types."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def primitive(self, name: str) -> str:
+        return f"borsh.{name}"
+
+    def call(self, func: str, args: Iterable[str], **kwargs: Any) -> str:
+        keywords = [f"{key}={kwarg!r}" for key, kwarg in kwargs.items()]
+        joined = ", ".join([*args, *keywords])
+        return f"borsh.{func}({joined})"
+
+    def renamed(self, name: str, expr: str) -> str:
+        return f"{name!r} / {expr}"
+
+    def array(self, item: str, length: int) -> str:
+        return f"{item}[{length}]"
+
+    def literal(self, literal: str) -> str:
+        return repr(literal)
+
+    def define(self, name: str, expr: str) -> str:
+        reference = f"TYPES[{name!r}]"
+        self.lines.append(f"{reference} = {expr}")
+        return reference
+
+
+class _Generator(object):
+    def __init__(
+        self,
+        definitions: List[Mapping[str, Any]],
+        maker: Any,
+    ) -> None:
+        self.definitions = {
+            definition["name"]: definition["type"] for definition in definitions
+        }
+        self.maker = maker
+        self.done: Dict[str, Any] = {}
+        self.pending: Set[str] = set()
+
+    def define(self, name: str) -> Any:
+        reference = self.done.get(name)
+        if reference is not None:
+            return reference
+        if name in self.pending:
+            raise ValueError(f"Recursive type {name} is not supported.")
+        if name not in self.definitions:
+            raise ValueError(f"Undefined type {name}.")
+        self.pending.add(name)
+        definition = self.definition(name, self.definitions[name])
+        self.done[name] = self.maker.define(name, definition)
+        return self.done[name]
+
+    def definition(self, name: str, definition: Mapping[str, Any]) -> Any:
+        kind = definition["kind"]
+        if kind == "struct":
+            return self.fields(definition.get("fields", []))
+        if kind == "enum":
+            variants = [self.variant(variant) for variant in definition["variants"]]
+            return self.maker.call("Enum", variants, enum_name=name)
+        raise ValueError(f"Unknown kind of type: {kind}")
+
+    def variant(self, variant: Mapping[str, Any]) -> Any:
+        if "fields" not in variant:
+            return self.maker.literal(variant["name"])
+        return self.maker.renamed(variant["name"], self.fields(variant["fields"]))
+
+    def fields(self, fields: List[Any]) -> Any:
+        if fields and isinstance(fields[0], Mapping) and "name" in fields[0]:
+            named = [
+                self.maker.renamed(field["name"], self.type_expr(field["type"]))
+                for field in fields
+            ]
+            return self.maker.call("CStruct", named)
+        return self.maker.call("TupleStruct", map(self.type_expr, fields))
+
+    def type_expr(self, type_def: Any) -> Any:
+        resolved = _resolve(type_def)
+        if isinstance(resolved, str):
+            if resolved not in _PRIMITIVES:
+                raise ValueError(f"Unknown type: {resolved}")
+            return self.maker.primitive(_PRIMITIVES[resolved])
+        if len(resolved) != 1:
+            raise ValueError(f"Unknown type: {resolved}")
+        kind, arg = next(iter(resolved.items()))
+        wrapper = _WRAPPERS.get(kind)
+        if wrapper is not None:
+            return self.maker.call(wrapper, [self.type_expr(arg)])
+        if kind == "defined":
+            return self.define(arg["name"] if isinstance(arg, Mapping) else arg)
+        return self.compound_expr(kind, arg)
+
+    def compound_expr(self, kind: str, arg: Any) -> Any:
+        if kind == "array":
+            return self.maker.array(self.type_expr(arg[0]), int(arg[1]))
+        if kind == "hashMap":
+            return self.maker.call("HashMap", map(self.type_expr, arg))
+        if kind == "tuple":
+            return self.maker.call("TupleStruct", map(self.type_expr, arg))
+        raise ValueError(f"Unknown type: {kind}")
+
+
+def _description(idl: Union[str, bytes, Mapping[str, Any]]) -> Mapping[str, Any]:
+    if isinstance(idl, (str, bytes)):
+        return json.loads(idl)
+    return idl
+
+
+def _generate(idl: Union[str, bytes, Mapping[str, Any]], maker: Any) -> None:
+    description = _description(idl)
+    definitions = [*description.get("types", []), *description.get("accounts", [])]
+    generator = _Generator(definitions, maker)
+    for definition in definitions:
+        generator.define(definition["name"])
+
+
+def schema_source(idl: Union[str, bytes, Mapping[str, Any]]) -> str:
+    """Generate the Python source of a module defining the types of a schema.
+
+    See `load_schema` for the format of the schema. The module defines a
+    `TYPES` dict mapping each type name to its Borsh type, for checking in
+    instead of loading the schema at run time.
+
+    Args:
+        idl (Union[str, bytes, Mapping[str, Any]]): the JSON or decoded schema.
+
+    Returns:
+        str: the module source.
+    """
+    source = _Source()
+    _generate(idl, source)
+    return "\n".join([_HEADER, *source.lines, ""])
+
+
+def load_schema(idl: Union[str, bytes, Mapping[str, Any]]) -> Dict[str, Construct]:
+    """Create Borsh types from a JSON schema, such as an Anchor IDL.
+
+    The schema lists its types under `"types"` and `"accounts"`, each with
+    a `"name"` and a `"type"` of kind `"struct"` (with `"fields"`) or
+    `"enum"` (with `"variants"`). Field types are primitive names like
+    `"u64"` or `"string"`, or `{"vec": ...}`, `{"option": ...}`,
+    `{"hashMap": [..., ...]}`, `{"hashSet": ...}`, `{"array": [..., n]}`,
+    `{"tuple": [...]}` and `{"defined": "Name"}`.
+
+    Args:
+        idl (Union[str, bytes, Mapping[str, Any]]): the JSON or decoded schema.
+
+    Returns:
+        Dict[str, Construct]: the types, by name.
+    """
+    types = _Types()
+    _generate(idl, types)
+    return types.types
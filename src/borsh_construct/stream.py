@@ -0,0 +1,203 @@
+from hashlib import sha256
+from io import BytesIO
+from typing import Any, Iterable, Optional, Tuple, cast
+from construct import Construct, Container, RangeError
+
+from .core import U32, HashMap, HashSet, check_length
+from .core import _PrefixedArray  # noqa: WPS450
+
+DEFAULT_CHUNK_SIZE = 65536
+_PATH = "(building)"
+_UNSORTED_ERROR = ValueError(
+    "HashMap and HashSet items must be in strictly increasing order.",
+)
+
+
+def _unwrap(subcon: Construct) -> Tuple[_PrefixedArray, Any]:
+    if isinstance(subcon, HashMap):
+        return cast(_PrefixedArray, subcon.subcon), lambda item: item[0]
+    if isinstance(subcon, HashSet):
+        return cast(_PrefixedArray, subcon.subcon), lambda item: item
+    if isinstance(subcon, _PrefixedArray):
+        return subcon, None
+    raise TypeError(f"Expected a Vec, HashMap or HashSet, found {subcon}")
+
+
+def _build_context() -> "Container[Any]":
+    context: "Container[Any]" = Container(
+        _parsing=False,
+        _building=True,
+        _sizing=False,
+    )
+    context["_params"] = context
+    return context
+
+
+class _ChunkedWriter(object):
+    def __init__(self, stream: Any, chunk_size: int) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.chunk = BytesIO()
+
+    def maybe_flush(self) -> None:
+        if self.chunk.tell() >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.stream.write(self.chunk.getvalue())
+        self.chunk.seek(0)
+        self.chunk.truncate()
+
+
+class HashingSink(object):
+    """A write-only stream that feeds everything written to it into a hash.
+
+    Pass it to `build_stream` or `build_iter` to hash an encoding while it is
+    being built. If `stream` is given, the data is written there as well;
+    otherwise only the hash is kept.
+    """
+
+    def __init__(self, hasher: Any = None, stream: Any = None) -> None:
+        """Init HashingSink.
+
+        Args:
+            hasher (Any): a `hashlib`-style object. Defaults to `hashlib.sha256()`.
+            stream (Any): an optional stream to also write the data to.
+        """
+        self.hasher = sha256() if hasher is None else hasher
+        self.stream = stream
+
+    def write(self, data: bytes) -> int:
+        """Hash data and forward it to the wrapped stream, if any."""  # noqa: DAR101
+        self.hasher.update(data)
+        if self.stream is not None:
+            self.stream.write(data)
+        return len(data)
+
+    def writable(self) -> bool:
+        """Return True: HashingSinks are always writable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return False: HashingSinks cannot seek."""
+        return False
+
+    def digest(self) -> bytes:
+        """Return the digest of everything written so far."""
+        return self.hasher.digest()
+
+    def hexdigest(self) -> str:
+        """Return the hex digest of everything written so far."""
+        return self.hasher.hexdigest()
+
+
+def build_hash(subcon: Construct, obj: Any, hasher: Any = None, **contextkw) -> Any:
+    """Hash the encoding of a value without keeping the encoding in memory.
+
+    Args:
+        subcon (Construct): the type to build.
+        obj (Any): the value to build.
+        hasher (Any): a `hashlib`-style object. Defaults to `hashlib.sha256()`.
+        contextkw: context entries, as for `Construct.build`.
+
+    Returns:
+        Any: the hasher, fed with the encoding of `obj`.
+    """
+    sink = HashingSink(hasher)
+    subcon.build_stream(obj, sink, **contextkw)  # type: ignore
+    return sink.hasher
+
+
+class _OrderCheck(object):
+    def __init__(self, sort_key: Any) -> None:
+        self.sort_key = sort_key
+        self.previous: Any = None
+        self.started = False
+
+    def check(self, item: Any) -> None:
+        if self.sort_key is None:
+            return
+        key = self.sort_key(item)
+        if self.started and key <= self.previous:
+            raise _UNSORTED_ERROR
+        self.previous = key
+        self.started = True
+
+
+def build_iter(
+    subcon: Construct,
+    items: Iterable[Any],
+    stream: Any,
+    length: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Build a `Vec`, `HashMap` or `HashSet` from an iterable, writing as it goes.
+
+    Unlike `subcon.build_stream`, this never holds all the items in memory.
+    Encoded items are written to `stream` in chunks of about `chunk_size` bytes.
+
+    If `length` is given, it is written as the length prefix and the iterable
+    must yield exactly that many items. Otherwise `stream` must be seekable,
+    and the prefix is patched once all items have been written.
+
+    `HashMap` items are `(key, value)` pairs and must be sorted by key,
+    `HashSet` items must be sorted too. Borsh requires this order,
+    and sorting would mean holding all the items.
+
+    Args:
+        subcon (Construct): a `Vec`, `HashMap` or `HashSet` type.
+        items (Iterable[Any]): the items to write.
+        stream (Any): a writable binary file-like object.
+        length (Optional[int]): the number of items, if known in advance.
+        chunk_size (int): the number of bytes to buffer before each write.
+
+    Returns:
+        int: the number of items written.
+    """
+    array_type, sort_key = _unwrap(subcon)
+    if length is None:
+        if not stream.seekable():
+            raise ValueError("length is required for unseekable streams.")
+        start = stream.tell()
+    else:
+        check_length(length, array_type.max_length, 0, None, _PATH)
+    writer = _ChunkedWriter(stream, chunk_size)
+    writer.chunk.write(U32.build(length or 0))
+    count = _build_items(array_type, items, writer, sort_key, length)
+    writer.flush()
+    if length is None:
+        _patch_length(stream, start, count)
+    elif count != length:
+        raise RangeError(f"expected {length} items, found {count}", path=_PATH)
+    return count
+
+
+def _patch_length(stream: Any, start: int, count: int) -> None:
+    end = stream.tell()
+    stream.seek(start)
+    stream.write(U32.build(count))
+    stream.seek(end)
+
+
+def _build_items(
+    array_type: _PrefixedArray,
+    items: Iterable[Any],
+    writer: _ChunkedWriter,
+    sort_key: Any,
+    length: Optional[int],
+) -> int:
+    context = _build_context()
+    build_item = array_type.subcon._build  # type: ignore  # noqa: WPS437
+    order = _OrderCheck(sort_key)
+    count = 0
+    for item in items:
+        count += 1
+        if length is not None and count > length:
+            # Fail before encoding the extra item or draining the iterable.
+            raise RangeError(f"expected {length} items, found more", path=_PATH)
+        check_length(count, array_type.max_length, 0, None, _PATH)
+        order.check(item)
+        context["_index"] = count - 1
+        build_item(item, writer.chunk, context, _PATH)
+        writer.maybe_flush()
+    return count
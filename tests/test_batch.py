@@ -0,0 +1,69 @@
+"""Batch and thread-safety tests."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from borsh_construct import (
+    U8,
+    U64,
+    Cached,
+    CStruct,
+    Enum,
+    HashMap,
+    Option,
+    String,
+    TupleStruct,
+    Vec,
+    build_many,
+    parse_many,
+)
+from borsh_construct.batch import default_workers, gil_enabled
+
+ACCOUNT = CStruct(
+    "owner" / String,
+    "balances" / HashMap(String, U64),
+    "delegate" / Option(TupleStruct(String, U8)),
+    "state" / Enum("Closed", "Open" / CStruct("since" / U64), enum_name="State"),
+    "log" / Vec(U8),
+)
+STATE = ACCOUNT.subcons[3].subcon.enum  # type: ignore
+ACCOUNTS = tuple(
+    {
+        "owner": f"owner{idx}",
+        "balances": {"sol": idx, "usdc": idx * 2},
+        "delegate": None if idx % 2 else (f"delegate{idx}", idx % 256),
+        "state": STATE.Open(since=idx) if idx % 3 else STATE.Closed(),
+        "log": list(range(idx % 50)),
+    }
+    for idx in range(300)
+)
+
+
+@pytest.mark.parametrize("max_workers", [None, 1, 4])
+def test_batch_roundtrip(max_workers) -> None:
+    """Check that batches match one-by-one builds and parses, in order."""
+    serialized = build_many(ACCOUNT, ACCOUNTS, max_workers=max_workers)
+    assert serialized == [ACCOUNT.build(account) for account in ACCOUNTS]
+    parsed = parse_many(ACCOUNT, serialized, max_workers=max_workers)
+    assert parsed == [ACCOUNT.parse(encoded) for encoded in serialized]
+
+
+def test_batch_small_inputs() -> None:
+    """Check that tiny batches are handled without a pool."""
+    assert parse_many(U8, [b"\x01"], max_workers=8) == [1]
+    assert not build_many(U8, [], max_workers=8)
+
+
+def test_default_workers() -> None:
+    """Check that threads are only used by default without the GIL."""
+    assert gil_enabled() == (default_workers() == 1)
+
+
+def test_shared_cached_type_across_threads() -> None:
+    """Check that one Cached type can be shared by many threads."""
+    cached = Cached(HashMap(String, U64), maxsize=16)
+    values = [{str(idx % 20): idx % 20} for idx in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        built = list(pool.map(cached.build, values))
+    assert built == [HashMap(String, U64).build(value) for value in values]
+    info = cached.cache_info()
+    assert info.hits + info.misses == len(values)
@@ -0,0 +1,95 @@
+"""Zero-copy parsing tests."""
+from io import SEEK_CUR, SEEK_END
+
+import pytest
+from borsh_construct import (
+    U32,
+    Bytes,
+    U8,
+    CStruct,
+    HashMap,
+    HashSet,
+    String,
+    Vec,
+    parse_buffer,
+)
+from borsh_construct.buffer import BufferStream, LazyString
+from construct import GreedyBytes, StreamError
+
+BLOB = CStruct("id" / U32, "name" / String, "blobs" / Vec(Bytes))
+
+
+def test_parse_buffer_returns_views() -> None:
+    """Check that Bytes values are slices of the input buffer."""
+    to_build = {"id": 7, "name": "🚀", "blobs": [b"abc", b""]}
+    data = bytearray(BLOB.build(to_build))
+    parsed = parse_buffer(BLOB, data)
+    assert parsed == to_build
+    assert isinstance(parsed.name, LazyString)
+    first_blob = parsed.blobs[0]
+    assert isinstance(first_blob, memoryview)
+    data[-7] = ord("z")
+    assert first_blob == b"zbc"
+    with pytest.raises(BufferError):
+        data.clear()
+
+
+def test_parse_buffer_roundtrip() -> None:
+    """Check that zero-copy results can be built again."""
+    schema = HashMap(String, Bytes)
+    to_build = {"a": b"\x00\x01", "bc": b"\x02"}
+    serialized = schema.build(to_build)
+    assert schema.build(parse_buffer(schema, serialized)) == serialized
+
+
+def test_parse_buffer_hashable_bytes() -> None:
+    """Check that Bytes keys parsed from a bytearray can be hashed."""
+    mapping = HashMap(Bytes, U8)
+    to_build = {b"a": 1, b"bc": 2}
+    assert parse_buffer(mapping, bytearray(mapping.build(to_build))) == to_build
+    members = HashSet(Bytes)
+    serialized = bytearray(members.build({b"x", b"yz"}))
+    assert parse_buffer(members, serialized) == {b"x", b"yz"}
+
+
+def test_parse_buffer_invalid_utf8_is_lazy() -> None:
+    """Check that invalid UTF-8 only raises once the string is used."""
+    parsed = parse_buffer(String, b"\x01\x00\x00\x00\xff")
+    with pytest.raises(UnicodeDecodeError):
+        str(parsed)
+
+
+def test_parse_buffer_short_read_raises() -> None:
+    """Check that truncated payloads are rejected."""
+    with pytest.raises(StreamError):
+        parse_buffer(Bytes, b"\x05\x00\x00\x00abc")
+
+
+def test_lazy_string() -> None:
+    """Check that LazyString behaves like the str it decodes to."""
+    lazy = LazyString(memoryview("héllo".encode()))
+    assert lazy == "héllo"
+    assert lazy == LazyString(memoryview(b"h\xc3\xa9llo"))
+    assert lazy != "hello"
+    assert hash(lazy) == hash("héllo")
+
+
+def test_lazy_string_str_methods() -> None:
+    """Check the str-like helpers of LazyString."""
+    lazy = LazyString(memoryview("héllo".encode()))
+    assert len(lazy) == 5
+    assert repr(lazy) == "LazyString('héllo')"
+    assert lazy > "abc"
+    assert lazy < LazyString(memoryview(b"world"))
+
+
+def test_buffer_stream() -> None:
+    """Check the file-like interface of BufferStream."""
+    stream = BufferStream(b"abcdef")
+    assert stream.readable() and stream.seekable()
+    assert stream.read(2) == b"ab"
+    stream.seek(1, SEEK_CUR)
+    assert stream.tell() == 3
+    assert stream.read() == b"def"
+    stream.seek(-2, SEEK_END)
+    assert GreedyBytes.parse_stream(stream) == b"ef"  # type: ignore
@@ -0,0 +1,232 @@
+"""Cache tests."""
+from copy import copy
+from hashlib import blake2b
+from math import nan
+
+import pytest
+from borsh_construct import (
+    F32,
+    F64,
+    U8,
+    U64,
+    Cached,
+    CStruct,
+    DecodeCache,
+    Enum,
+    HashMap,
+    HashSet,
+    Option,
+    String,
+    TupleStruct,
+    Vec,
+    trusted,
+)
+from borsh_construct.cache import DIGEST_SIZE, CacheInfo
+from construct import FormatField, FormatFieldError
+
+ZERO = float(0)
+NEGATIVE_ZERO = -ZERO
+
+
+def test_encode_cache_hits() -> None:
+    """Check that repeated values reuse their cached encoding."""
+    cached = Cached(HashMap(String, U64), maxsize=2)
+    accounts = {"alice": 10, "bob": 20}
+    expected = HashMap(String, U64).build(accounts)
+    assert cached.build(accounts) == expected
+    assert cached.build(dict(accounts)) == expected
+    assert cached.cache_info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+    assert cached.parse(expected) == accounts
+
+
+def test_encode_cache_in_struct() -> None:
+    """Check that cached encodings are spliced into the surrounding output."""
+    table = Cached(HashSet(U8))
+    uncached = CStruct("nonce" / U64, "table" / HashSet(U8))
+    schema = CStruct("nonce" / U64, "table" / table)
+    for nonce in range(3):
+        to_build = {"nonce": nonce, "table": frozenset((1, 2, 3))}
+        assert schema.build(to_build) == uncached.build(to_build)
+    assert table.cache_info().hits == 2
+
+
+def test_encode_cache_evicts_least_recently_used() -> None:
+    """Check that the cache never grows beyond maxsize."""
+    cached = Cached(TupleStruct(U8, U8), maxsize=2)
+    for pair in ((1, 1), (2, 2), (1, 1), (3, 3), (1, 1)):
+        cached.build(pair)
+    assert cached.cache_info() == CacheInfo(
+        hits=2,
+        misses=3,
+        maxsize=2,
+        currsize=2,
+        evictions=1,
+    )
+    cached.cache_clear()
+    assert cached.cache_info() == CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_encode_cache_skips_unhashable() -> None:
+    """Check that unhashable values are built without touching the cache."""
+    cached = Cached(Vec(U8))
+    assert cached.build([1, 2]) == Vec(U8).build([1, 2])
+    assert cached.cache_info().currsize == 0
+
+
+def test_encode_cache_frozen_enum() -> None:
+    """Check that frozen enum variants are hashable and cacheable."""
+    enum_type = Enum(
+        "Unit",
+        "Pair" / TupleStruct(U8, U8),
+        enum_name="Frozen",
+        frozen=True,
+    )
+    cached = Cached(enum_type)
+    variant = enum_type.enum.Pair((1, 2))
+    assert cached.build(variant) == cached.build(enum_type.enum.Pair((1, 2)))
+    assert cached.cache_info().hits == 1
+    assert cached.parse(b"\x00") == enum_type.enum.Unit()
+
+
+def test_encode_cache_parsed_frozen_enum() -> None:
+    """Check that parsed frozen variants hash, so rebuilding them is cached."""
+    enum_type = Enum(
+        "Pair" / TupleStruct(U8, U8),
+        "Named" / CStruct("items" / Vec(U8), "tags" / HashSet(U8)),
+        enum_name="ParsedFrozen",
+        frozen=True,
+    )
+    cached = Cached(enum_type)
+    pair = enum_type.parse(b"\x00\x01\x02")
+    named = enum_type.build(enum_type.enum.Named(items=[1, 2], tags={3}))
+    assert pair == enum_type.enum.Pair((1, 2))
+    assert enum_type.parse(named).items == (1, 2)
+    for parsed in (pair, enum_type.parse(named), pair):
+        cached.build(parsed)
+    assert cached.cache_info().hits == 1
+
+
+NESTED = Enum(
+    "Order" / CStruct(
+        "book" / CStruct("name" / String, "levels" / Vec(U8)),
+        "fills" / HashMap(String, U64),
+    ),
+    enum_name="Nested",
+    frozen=True,
+)
+
+
+def test_frozen_enum_nested_fields_hash() -> None:
+    """Check that struct and map fields of frozen variants hash, parsed or not."""
+    order = NESTED.enum.Order(
+        book={"name": "sol", "levels": [1, 2]},
+        fills={"alice": 3},
+    )
+    parsed = NESTED.parse(NESTED.build(order))
+    assert parsed == order
+    assert hash(parsed) == hash(order)
+    assert parsed.book.levels == (1, 2)
+    cached = Cached(NESTED)
+    assert cached.build(parsed) == cached.build(order) == NESTED.build(order)
+    assert cached.cache_info().hits == 1
+
+
+def test_frozen_enum_fields_read_only() -> None:
+    """Check that frozen fields cannot change, but can still be copied."""
+    decode = DecodeCache(NESTED)
+    order = NESTED.enum.Order(book={"name": "a", "levels": []}, fills={})
+    order = decode.parse(NESTED.build(order))
+    with pytest.raises(TypeError):
+        order.book.name = "b"
+    with pytest.raises(TypeError):
+        order.fills["bob"] = 1
+    assert copy(order.fills) is order.fills
+    assert "Container(name=" in repr(order)
+    assert decode.parse(NESTED.build(order)) == order
+
+
+def test_encode_cache_signed_zero() -> None:
+    """Check that 0.0 and -0.0 are cached apart, as they encode differently."""
+    cached_float = Cached(F64)
+    assert cached_float.build(ZERO) == F64.build(ZERO)
+    assert cached_float.build(NEGATIVE_ZERO) == F64.build(NEGATIVE_ZERO)
+    pair_type = TupleStruct(F32, U8)
+    cached_pair = Cached(pair_type)
+    assert cached_pair.build((ZERO, 1)) == pair_type.build((ZERO, 1))
+    assert cached_pair.build((NEGATIVE_ZERO, 1)) == pair_type.build((NEGATIVE_ZERO, 1))
+
+
+def test_encode_cache_signed_zero_in_enum() -> None:
+    """Check that float keys are sign-aware inside enum variants too."""
+    enum_type = Enum("Value" / TupleStruct(F64), enum_name="Signed", frozen=True)
+    cached_enum = Cached(enum_type)
+    cached_enum.build(enum_type.enum.Value((ZERO,)))
+    negative = enum_type.enum.Value((NEGATIVE_ZERO,))
+    assert cached_enum.build(negative) == enum_type.build(negative)
+
+
+def test_encode_cache_trusted_copy_is_separate() -> None:
+    """Check that a trusted copy does not share encodings with the original."""
+    strict = Cached(F64)
+    assert trusted(strict).build(nan) == FormatField("<", "d").build(nan)
+    with pytest.raises(FormatFieldError):
+        strict.build(nan)
+    assert strict.cache_info().currsize == 0
+
+
+def test_encode_cache_bad_maxsize_raises() -> None:
+    """Check that the cache must be able to hold something."""
+    with pytest.raises(ValueError):
+        Cached(U8, maxsize=0)
+
+
+ACCOUNT = CStruct("owner" / String, "balances" / HashMap(String, U64))
+
+
+def test_decode_cache_hits() -> None:
+    """Check that parsing the same bytes again is served from the cache."""
+    cache = DecodeCache(ACCOUNT, maxsize=2)
+    serialized = ACCOUNT.build({"owner": "alice", "balances": {"sol": 5}})
+    first = cache.parse(serialized)
+    first.balances["sol"] = 0
+    second = cache.parse(bytearray(serialized))
+    assert second.balances == {"sol": 5}
+    assert cache.cache_info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+    assert cache.cache_info().hit_rate == pytest.approx(0.5)
+
+
+def test_decode_cache_shared_values() -> None:
+    """Check that copy=False hands out the cached value itself."""
+    cache = DecodeCache(ACCOUNT, copy=False)
+    serialized = ACCOUNT.build({"owner": "bob", "balances": {}})
+    assert cache.parse(serialized) is cache.parse(serialized)
+
+
+def test_decode_cache_caches_none() -> None:
+    """Check that a parsed None is cached like any other value."""
+    cache = DecodeCache(Option(U8))
+    assert cache.parse(b"\x00") is None
+    assert cache.parse(b"\x00") is None
+    assert cache.cache_info().hits == 1
+
+
+def test_decode_cache_digest_keys_and_evictions() -> None:
+    """Check that large inputs are keyed by digest and old entries are evicted."""
+    cache = DecodeCache(Vec(U8), maxsize=1, digest_threshold=8)
+    payloads = [Vec(U8).build(range(idx, idx + 100)) for idx in range(3)]
+    for payload in payloads:
+        assert cache.parse(payload) == list(payload[4:])
+    assert cache.cache_info().evictions == 2
+    assert not cache.cache_info().hit_rate
+    cache.cache_clear()
+    assert cache.cache_info() == CacheInfo(hits=0, misses=0, maxsize=1, currsize=0)
+
+
+def test_decode_cache_raw_and_digest_keys_apart() -> None:
+    """Check that a short input equal to a long input's digest is not a hit."""
+    owner = CStruct("owner" / U8[32])
+    cache = DecodeCache(owner, digest_threshold=32)
+    legit = bytes(range(32)) + bytes(274)
+    forged = blake2b(legit, digest_size=DIGEST_SIZE).digest()
+    assert list(cache.parse(forged).owner) == list(forged)
+    assert list(cache.parse(legit).owner) == list(range(32))
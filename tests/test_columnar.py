@@ -0,0 +1,167 @@
+"""Columnar tests."""
+import tracemalloc
+from array import array
+from io import BufferedReader, BytesIO, RawIOBase
+from math import isnan, nan
+from typing import Any, Dict, List
+
+import pytest
+from borsh_construct import (
+    F32,
+    F64,
+    I16,
+    I64,
+    U8,
+    U64,
+    U128,
+    Bool,
+    Columnar,
+    CStruct,
+    String,
+    Vec,
+    trusted,
+)
+from construct import FormatFieldError, RangeError, SizeofError, StreamError
+
+numpy = pytest.importorskip("numpy")
+
+TICK = CStruct(
+    "price" / F64,
+    "size" / U64,
+    "side" / Bool,
+    "level" / I16,
+    "weight" / F32,
+    "delta" / I64,
+)
+TICKS = (
+    {"price": 1.5, "size": 10, "side": True, "level": -2, "weight": 0.5, "delta": -7},
+    {"price": 2.5, "size": 20, "side": False, "level": 3, "weight": 0.25, "delta": 8},
+)
+SERIALIZED = Vec(TICK).build(list(TICKS))
+
+
+def test_columnar_array() -> None:
+    """Check that records are decoded into one array per field."""
+    columns = Columnar(TICK).parse(SERIALIZED)
+    assert columns == {
+        "price": array("d", [1.5, 2.5]),
+        "size": array("Q", [10, 20]),
+        "side": array("B", [1, 0]),
+        "level": array("h", [-2, 3]),
+        "weight": array("f", [0.5, 0.25]),
+        "delta": array("q", [-7, 8]),
+    }
+    assert Columnar(TICK).build(columns) == SERIALIZED
+
+
+def test_columnar_numpy() -> None:
+    """Check that records are decoded into a NumPy structured array."""
+    columnar = Columnar(TICK, backend="numpy")
+    records = columnar.parse(SERIALIZED)
+    assert records.dtype == columnar.dtype
+    assert records["size"].tolist() == [10, 20]
+    assert records["side"].tolist() == [True, False]
+    assert columnar.build(records) == SERIALIZED
+    fields = TICK._subcons  # noqa: WPS437
+    empty: Dict[str, List[float]] = {field: [] for field in fields}
+    assert columnar.build(empty) == b"\x00\x00\x00\x00"
+
+
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_columnar_nan(backend: str) -> None:
+    """Check that nan is rejected unless the record type is trusted."""
+    record = CStruct("x" / F64, "n" / U8)
+    serialized = trusted(Vec(record)).build([{"x": nan, "n": 1}])
+    with pytest.raises(FormatFieldError):
+        Columnar(record, backend=backend).parse(serialized)
+    with pytest.raises(FormatFieldError):
+        Columnar(record, backend=backend).build({"x": [nan], "n": [1]})
+    trusted_columnar = Columnar(trusted(record), backend=backend)  # type: ignore
+    columns = trusted_columnar.parse(serialized)
+    assert trusted_columnar.build(columns) == serialized
+
+
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_columnar_bool_bytes(backend: str) -> None:
+    """Check that any non-zero Bool byte is read as True, like Vec(Bool)."""
+    serialized = b"\x03\x00\x00\x00\x00\x01\x02"
+    columns = Columnar(CStruct("flag" / Bool), backend=backend).parse(serialized)
+    assert list(columns["flag"]) == [False, True, True]
+    assert Vec(Bool).parse(serialized) == [False, True, True]
+
+
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_columnar_build_like_vec(backend: str) -> None:
+    """Check that building writes Bool and out-of-range values like Vec."""
+    columnar = Columnar(CStruct("flag" / Bool, "count" / U8), backend=backend)
+    serialized = columnar.build({"flag": [2, True], "count": [1, 2]})
+    assert serialized == b"\x02\x00\x00\x00\x01\x01\x01\x02"
+    assert Vec(Bool).build([2, True]) == b"\x02\x00\x00\x00\x01\x01"
+    with pytest.raises(FormatFieldError):
+        Vec(U8).build([300])
+    with pytest.raises(FormatFieldError, match="count"):
+        columnar.build({"flag": [True], "count": [300]})
+
+
+def test_columnar_trusted() -> None:
+    """Check that trusted() reaches the record type inside Columnar."""
+    record = CStruct("x" / F64)
+    serialized = trusted(Vec(record)).build([{"x": nan}])
+    columns = trusted(Columnar(record)).parse(serialized)
+    assert isnan(columns["x"][0])
+    with pytest.raises(FormatFieldError):
+        Columnar(record).parse(serialized)
+
+
+def test_columnar_length_checks() -> None:
+    """Check the length prefix and column lengths."""
+    columnar = Columnar(CStruct("n" / U8), max_length=1)
+    with pytest.raises(RangeError):
+        columnar.parse(b"\x02\x00\x00\x00\x01\x02")
+    with pytest.raises(RangeError):
+        columnar.build({"n": [1, 2]})
+    with pytest.raises(ValueError):
+        Columnar(CStruct("a" / U8, "b" / U8)).build({"a": [1], "b": []})
+    with pytest.raises(SizeofError):
+        columnar.sizeof()
+
+
+class _PipeStream(RawIOBase):
+    """A raw stream that cannot seek, like a pipe or a socket."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        return self.data.readinto(buffer)
+
+
+def test_columnar_huge_prefix_unsized_stream() -> None:
+    """Check that a huge prefix on a pipe fails without allocating for it."""
+    columnar = Columnar(CStruct("x" / F64))
+    pipe = BufferedReader(_PipeStream(b"\x00\x00\x00\x10\x01"))
+    tracemalloc.start()
+    with pytest.raises(StreamError):
+        columnar.parse_stream(pipe)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1 << 22
+
+
+@pytest.mark.parametrize(
+    "record",
+    [CStruct("name" / String), CStruct("big" / U128), CStruct()],
+)
+def test_columnar_bad_record_raises(record: CStruct) -> None:
+    """Check that only non-empty records of fixed-size numbers are accepted."""
+    with pytest.raises(ValueError):
+        Columnar(record)
+
+
+def test_columnar_bad_backend_raises() -> None:
+    """Check that the backend must be known."""
+    with pytest.raises(ValueError):
+        Columnar(CStruct("n" / U8), backend="pandas")
@@ -1,4 +1,7 @@
 """Core tests."""
+import tracemalloc
+from io import SEEK_END, SEEK_SET, BufferedReader, BytesIO, RawIOBase
+from math import isnan
 from typing import Any
 
 import pytest
@@ -25,6 +28,8 @@ from borsh_construct import (
     HashMap,
     HashSet,
     Bytes,
+    trusted,
+    set_max_length,
 )
 from borsh_construct.core import (
     NAMED_TUPLE_FIELD_ERROR,
@@ -34,7 +39,16 @@ from borsh_construct.core import (
     UNDERSCORE_NAME_ERROR,
     TUPLE_DATA_NAME_ERROR,
 )
-from construct import Construct, Float32l, Float64l, FormatField, FormatFieldError
+from construct import (
+    Construct,
+    Float32l,
+    Float64l,
+    FormatField,
+    FormatFieldError,
+    RangeError,
+    SizeofError,
+    StreamError,
+)
 
 ENUM = Enum(
     "Unit",
@@ -337,6 +351,30 @@ def test_nan_floats(nonan_type: FormatField, construct_type: FormatField) -> Non
         nonan_type.parse(nan_serialized)
 
 
+@pytest.mark.parametrize("obj_type,obj_input,expected", TYPE_INPUT_EXPECTED)
+def test_trusted_serde(obj_type: Construct, obj_input: Any, expected: Any) -> None:
+    """Check that trusted types handle valid data like the originals."""
+    trusted_type = trusted(obj_type)
+    serialized = trusted_type.build(obj_input)
+    assert list(serialized) == expected
+    assert trusted_type.parse(serialized) == obj_input
+
+
+def test_trusted_skips_nan_check() -> None:
+    """Check that trusted floats skip the nan check and the original is unchanged."""
+    schema = CStruct("x" / F32, "y" / Option(F64))
+    nan = float("nan")  # noqa: WPS456
+    serialized = trusted(schema).build({"x": 0.5, "y": nan})
+    assert serialized == CStruct("x" / Float32l, "y" / Option(Float64l)).build(
+        {"x": 0.5, "y": nan},
+    )
+    parsed = trusted(schema).parse(serialized)
+    assert parsed.x == pytest.approx(0.5)
+    assert isnan(parsed.y)
+    with pytest.raises(FormatFieldError):
+        schema.parse(serialized)
+
+
 def test_named_tuple_struct_field_raises() -> None:
     """Check that error is raised if TupleStruct field is named."""
     with pytest.raises(ValueError) as exc:
@@ -384,3 +422,187 @@ def test_duplicate_variant_name_raises() -> None:
     with pytest.raises(ValueError) as excinfo:
         Enum("foo", "foo", enum_name="placeholder")
     assert "must be unique" in str(excinfo.value)
+
+
+def test_enum_class_created_once() -> None:
+    """Check that the lazily created enum class is shared by copies."""
+    enum_type = Enum("foo", "bar" / TupleStruct(U8), enum_name="Lazy")
+    trusted_type = trusted(enum_type)
+    assert enum_type.enum is enum_type.enum
+    assert trusted_type.parse(b"\x01\x02") == enum_type.enum.bar([2])
+
+
+class _RacingLock(object):
+    """A lock that another thread always wins first."""
+
+    def __init__(self, lazy_enum: Any, winner: type) -> None:
+        self.lazy_enum = lazy_enum
+        self.winner = winner
+
+    def __enter__(self) -> None:
+        self.lazy_enum.klass = self.winner
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Release nothing."""  # noqa: DAR101
+
+
+def test_enum_class_created_once_across_threads() -> None:
+    """Check that a class created while waiting for the lock is kept."""
+    enum_type = Enum("foo", enum_name="Racy")
+    lazy_enum = enum_type._lazy_enum  # noqa: WPS437
+    winner = type("Racy", (object,), {})
+    lazy_enum.lock = _RacingLock(lazy_enum, winner)  # type: ignore
+    assert enum_type.enum is winner
+
+
+class _PipeStream(RawIOBase):
+    """A raw stream that cannot seek, like a pipe or a socket."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        return self.data.readinto(buffer)
+
+
+class _FileStream(object):
+    """A seekable stream that counts how often it seeks to its end."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = BytesIO(data)
+        self.end_seeks = 0
+
+    def read(self, size: int = -1) -> bytes:
+        return self.data.read(size)
+
+    def tell(self) -> int:
+        return self.data.tell()
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_END:
+            self.end_seeks += 1
+        return self.data.seek(offset, whence)
+
+
+class _UnsizedStream(_FileStream):
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_END:
+            raise ValueError("cannot seek from the end")
+        return super().seek(offset, whence)
+
+
+def _pipe(data: bytes) -> BufferedReader:
+    return BufferedReader(_PipeStream(data))
+
+
+@pytest.mark.parametrize(
+    "obj_type,too_long",
+    [
+        (Vec(U8, max_length=2), [1, 2, 3]),
+        (HashSet(U8, max_length=2), {1, 2, 3}),
+        (HashMap(U8, U8, max_length=2), {1: 1, 2: 2, 3: 3}),
+    ],
+)
+def test_max_length(obj_type: Construct, too_long: Any) -> None:
+    """Check that per-type length limits apply to parsing and building."""
+    with pytest.raises(RangeError):
+        obj_type.build(too_long)
+    with pytest.raises(RangeError):
+        obj_type.parse(b"\x03\x00\x00\x00\x01\x01\x02\x02\x03\x03")
+
+
+@pytest.fixture
+def default_max_length():
+    """Set a default max length of 2 for one test.
+
+    Yields:
+        int: the default max length.
+    """
+    set_max_length(2)
+    yield 2
+    set_max_length(None)
+
+
+@pytest.mark.usefixtures("default_max_length")
+def test_default_max_length() -> None:
+    """Check that the default limit applies to every length prefix."""
+    assert Vec(U8).parse(b"\x02\x00\x00\x00\x01\x02") == [1, 2]
+    assert Vec(U8, max_length=3).build([1, 2, 3]) == b"\x03\x00\x00\x00\x01\x02\x03"
+    with pytest.raises(RangeError):
+        String.build("abc")
+    with pytest.raises(RangeError):
+        Bytes.parse(b"\x03\x00\x00\x00abc")
+
+
+@pytest.mark.parametrize(
+    "item_type",
+    [CStruct(), TupleStruct(), U8[0]],
+)
+def test_zero_size_items_need_limit(item_type: Construct) -> None:
+    """Check that counts of zero-size items are refused unless limited."""
+    huge = b"\x00\x00\x00\x10"
+    with pytest.raises(RangeError):
+        Vec(item_type).parse(huge)
+    assert not Vec(item_type).parse(bytes(4))
+    with pytest.raises(RangeError):
+        Vec(item_type, max_length=2).parse(huge)
+    assert len(Vec(item_type, max_length=2).parse(b"\x02\x00\x00\x00")) == 2
+
+
+@pytest.mark.parametrize(
+    "obj_type",
+    [Vec(U8), Vec(String), HashMap(U64, String), HashSet(U8), Bytes, String],
+)
+def test_huge_length_prefix_raises(obj_type: Construct) -> None:
+    """Check that a length prefix longer than the input fails before allocating."""
+    with pytest.raises(StreamError) as excinfo:
+        obj_type.parse(b"\xff\xff\xff\xff\x00")
+    assert "needs at least" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("stream_type", [_pipe, _UnsizedStream])
+def test_length_prefix_unsized_stream(stream_type: Any) -> None:
+    """Check that streams of unknown size are still read correctly."""
+    vec = Vec(U16)
+    stream = stream_type(vec.build([1, 2]))
+    assert vec.parse_stream(stream) == [1, 2]
+    with pytest.raises(StreamError):
+        vec.parse_stream(stream_type(b"\x03\x00\x00\x00"))
+
+
+@pytest.mark.parametrize("obj_type", [Vec(U16), Vec(String), Bytes])
+def test_huge_length_prefix_unsized_stream(obj_type: Construct) -> None:
+    """Check that a huge prefix on a pipe fails without allocating for it."""
+    tracemalloc.start()
+    with pytest.raises(StreamError):
+        obj_type.parse_stream(_pipe(b"\x00\x00\x00\x10\x01\x00"))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1 << 22
+
+
+def test_long_values_unsized_stream() -> None:
+    """Check that values longer than the first allocation are read whole."""
+    vec = Vec(U16)
+    items = list(range(10000))
+    assert vec.parse_stream(_pipe(vec.build(items))) == items
+    blob = bytes(3 << 20)
+    assert Bytes.parse_stream(_pipe(Bytes.build(blob))) == blob
+
+
+def test_stream_size_looked_up_once() -> None:
+    """Check that the end of a stream is only looked up once per parse."""
+    schema = Vec(CStruct("name" / String, "data" / Bytes))
+    to_build = [{"name": str(idx), "data": b"x"} for idx in range(5)]
+    stream = _FileStream(schema.build(to_build))
+    assert schema.parse_stream(stream) == to_build  # type: ignore
+    assert stream.end_seeks == 1
+
+
+def test_vec_sizeof_raises() -> None:
+    """Check that Vec does not claim a fixed size."""
+    with pytest.raises(SizeofError):
+        Vec(U8).sizeof()
@@ -0,0 +1,75 @@
+"""Variant peeking and dispatch tests."""
+import pytest
+from borsh_construct import (
+    U64,
+    Bytes,
+    CStruct,
+    Dispatcher,
+    Enum,
+    String,
+    TupleStruct,
+)
+from borsh_construct.enum import LazyVariant, VariantPeek
+from construct import MappingError, StreamError
+
+INSTRUCTION = Enum(
+    "Ping",
+    "Transfer" / CStruct("to" / String, "amount" / U64),
+    "Forward" / TupleStruct(Bytes),
+    enum_name="Instruction",
+)
+TRANSFER = INSTRUCTION.enum.Transfer(to="bob", amount=5)
+
+
+def test_peek_variant() -> None:
+    """Check that peeking reads the variant without decoding the body."""
+    data = INSTRUCTION.build(TRANSFER)
+    peek = INSTRUCTION.peek_variant(data)
+    assert peek == VariantPeek("Transfer", 1, memoryview(data)[1:])
+    assert peek.body.obj is data
+    assert INSTRUCTION.peek_variant(bytearray(b"\x00")).name == "Ping"
+
+
+@pytest.mark.parametrize(
+    "data,error",
+    [(b"", StreamError), (b"\x03", MappingError)],
+)
+def test_peek_variant_errors(data: bytes, error: type) -> None:
+    """Check that missing and unknown indices are rejected."""
+    with pytest.raises(error):
+        INSTRUCTION.peek_variant(data)
+
+
+def _forward(message: LazyVariant) -> bytes:
+    return bytes(message.body)
+
+
+def test_dispatcher() -> None:
+    """Check that messages are routed by variant and decoded only on demand."""
+    dispatch = Dispatcher(
+        INSTRUCTION,
+        {"Transfer": lambda message: message.value.amount, "Forward": _forward},
+        default=lambda message: message.name,
+    )
+    forwarded = INSTRUCTION.build(INSTRUCTION.enum.Forward((b"abc",)))
+    assert dispatch(INSTRUCTION.build(TRANSFER)) == 5
+    assert dispatch(forwarded) == forwarded[1:]
+    assert dispatch(b"\x00") == "Ping"
+
+
+def test_dispatcher_errors() -> None:
+    """Check that unknown handler names and unhandled variants are rejected."""
+    with pytest.raises(ValueError):
+        Dispatcher(INSTRUCTION, {"Transfr": _forward})
+    dispatch = Dispatcher(INSTRUCTION, {"Forward": _forward})
+    with pytest.raises(KeyError):
+        dispatch(b"\x00")
+
+
+def test_lazy_variant_decodes_once() -> None:
+    """Check that the body of a LazyVariant is decoded at most once."""
+    data = INSTRUCTION.build(TRANSFER)
+    message = LazyVariant(INSTRUCTION, data, INSTRUCTION.peek_variant(data))
+    assert message.value == TRANSFER
+    assert message.value is message.value
+    assert message.body[0] == len("bob")
@@ -0,0 +1,161 @@
+"""In-place patching tests."""
+import pytest
+from borsh_construct import (
+    I16,
+    U8,
+    U32,
+    U64,
+    Bytes,
+    Columnar,
+    CStruct,
+    Enum,
+    HashMap,
+    Option,
+    String,
+    TupleStruct,
+    Vec,
+    VecView,
+)
+from construct import MappingError, StreamError
+
+HEADER = CStruct("version" / U8, "nonce" / U64)
+ACCOUNT = CStruct(
+    "header" / HEADER,
+    "owner" / String,
+    "delegate" / Option(TupleStruct(String, U8)),
+    "state" / Enum("Closed", "Open" / CStruct("since" / U32), enum_name="State"),
+    "balances" / HashMap(String, Vec(I16)),
+    "points" / Vec(TupleStruct(U8, U8)),
+    "history" / Columnar(CStruct("slot" / U32)),
+    "counter" / U64,
+)
+STATE = ACCOUNT.subcons[3].subcon.enum  # type: ignore
+
+
+def _account(delegate, state) -> dict:
+    return {
+        "header": {"version": 1, "nonce": 5},
+        "owner": "alice",
+        "delegate": delegate,
+        "state": state,
+        "balances": {"sol": [1, -2], "usdc": []},
+        "points": [(1, 2), (3, 4)],
+        "history": {"slot": [7, 8, 9]},
+        "counter": 10,
+    }
+
+
+@pytest.mark.parametrize(
+    "delegate,state",
+    [(None, STATE.Closed()), (("bob", 3), STATE.Open(since=12))],
+)
+def test_patch_after_variable_fields(delegate, state) -> None:
+    """Check that variable-size fields are skipped to reach the target."""
+    to_build = _account(delegate, state)
+    serialized = bytearray(ACCOUNT.build(to_build))
+    ACCOUNT.patch(serialized, "counter", 11)
+    assert ACCOUNT.offset_of(serialized, "counter") == len(serialized) - 8
+    assert ACCOUNT.parse(bytes(serialized)).counter == 11
+    to_build["counter"] = 11
+    assert serialized == ACCOUNT.build(to_build)
+
+
+def test_patch_nested_field() -> None:
+    """Check that dotted names reach into nested structs."""
+    serialized = bytearray(ACCOUNT.build(_account(None, STATE.Closed())))
+    view = memoryview(serialized)
+    ACCOUNT.patch(view, "header.nonce", 2 ** 64 - 1)
+    assert ACCOUNT.offset_of(serialized, "header.nonce") == 1
+    assert ACCOUNT.parse(bytes(serialized)).header.nonce == 2 ** 64 - 1
+
+
+def test_offset_of_static_prefix() -> None:
+    """Check that fixed-size prefixes are not read at all."""
+    schema = CStruct("flags" / U8, "nonce" / U64, "name" / String)
+    assert schema.offset_of(bytes(9), "name") == 9
+
+
+def test_patch_errors() -> None:
+    """Check that bad patches are rejected without touching the buffer."""
+    schema = CStruct("name" / String, "data" / Bytes, "nonce" / U64)
+    serialized = bytearray(schema.build({"name": "a", "data": b"", "nonce": 1}))
+    with pytest.raises(TypeError):
+        schema.patch(bytes(serialized), "nonce", 2)
+    with pytest.raises(ValueError):
+        schema.patch(serialized, "name", "b")
+    with pytest.raises(KeyError):
+        schema.patch(serialized, "missing", 2)
+    with pytest.raises(KeyError):
+        schema.patch(serialized, "nonce.value", 2)
+    assert schema.parse(bytes(serialized)).nonce == 1
+
+
+def test_patch_truncated_buffer_raises() -> None:
+    """Check that fields past the end of the buffer are not written."""
+    schema = CStruct("data" / Bytes, "nonce" / U64)
+    serialized = bytearray(schema.build({"data": b"abc", "nonce": 1}))
+    with pytest.raises(StreamError):
+        schema.patch(serialized[:-1], "nonce", 2)
+    with pytest.raises(StreamError):
+        schema.offset_of(serialized[:5], "nonce")
+
+
+def test_offset_of_unknown_variant_raises() -> None:
+    """Check that an enum index without a variant fails, as in parsing."""
+    schema = CStruct("side" / Enum("Bid", "Ask", enum_name="Side"), "qty" / U8)
+    assert schema.offset_of(b"\x01\x05", "qty") == 1
+    with pytest.raises(MappingError):
+        schema.offset_of(b"\x09\x05", "qty")
+
+
+ORDER = CStruct("price" / U64, "qty" / U32)
+ORDERS = Vec(ORDER)
+
+
+def test_vec_view_random_access() -> None:
+    """Check that a VecView decodes items like the Vec itself."""
+    orders = [{"price": price, "qty": price % 7} for price in range(0, 200, 2)]
+    serialized = ORDERS.build(orders)
+    view = VecView(ORDERS, serialized)
+    assert len(view) == 100
+    assert view[3] == orders[3]
+    assert view[-1] == orders[-1]
+    assert view[10:20:3] == orders[10:20:3]
+    assert list(view) == ORDERS.parse(serialized)
+
+
+def test_vec_view_bisect() -> None:
+    """Check that binary search finds items by a key field."""
+    schema = CStruct("owner" / String, "orders" / ORDERS)
+    orders = [{"price": price, "qty": 1} for price in (1, 3, 3, 8)]
+    serialized = schema.build({"owner": "alice", "orders": orders})
+    view = VecView(ORDERS, serialized, schema.offset_of(serialized, "orders"))
+    assert view.bisect_left(3, key="price") == 1
+    assert view.bisect_right(3, key="price") == 3
+    assert view.bisect_left(9, key="price") == 4
+
+
+def test_vec_view_bisect_tuples() -> None:
+    """Check binary search by TupleStruct index and by whole items."""
+    pairs = Vec(TupleStruct(U8, U8))
+    pair_view = VecView(pairs, pairs.build([(1, 5), (2, 0), (4, 4)]))
+    assert pair_view.bisect_left(4, key=1) == 2
+    assert pair_view.bisect_right([2, 0]) == 2
+    assert VecView(Vec(U8), bytes((2, 0, 0, 0, 3, 7))).bisect_left(5) == 1
+
+
+def test_vec_view_errors() -> None:
+    """Check that bad types, indices and keys are rejected."""
+    with pytest.raises(TypeError):
+        VecView(HashMap(U8, U8), bytes(4))
+    with pytest.raises(ValueError):
+        VecView(Vec(String), bytes(4))
+    with pytest.raises(StreamError):
+        VecView(ORDERS, bytes((2, 0, 0, 0)))
+    view = VecView(ORDERS, ORDERS.build([{"price": 1, "qty": 1}]))
+    with pytest.raises(IndexError):
+        view[1]  # noqa: WPS428
+    with pytest.raises(KeyError):
+        view.bisect_left(1, key="missing")
+    with pytest.raises(TypeError):
+        view.bisect_left({"price": 1, "qty": 1})
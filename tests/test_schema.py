@@ -0,0 +1,110 @@
+"""Schema loading tests."""
+import json
+
+import pytest
+from borsh_construct import load_schema, schema_source
+
+IDL = json.dumps(
+    {
+        "types": [
+            {
+                "name": "Side",
+                "type": {
+                    "kind": "enum",
+                    "variants": [
+                        {"name": "Bid"},
+                        {
+                            "name": "Limit",
+                            "fields": [{"name": "price", "type": "u64"}],
+                        },
+                        {"name": "Pair", "fields": ["u8", "string"]},
+                    ],
+                },
+            },
+            {
+                "name": "Order",
+                "type": {
+                    "kind": "struct",
+                    "fields": [
+                        {"name": "side", "type": {"defined": "Side"}},
+                        {"name": "owner", "type": "publicKey"},
+                        {"name": "memo", "type": {"option": "bytes"}},
+                        {"name": "fills", "type": {"hashMap": ["u32", "i64"]}},
+                        {"name": "flags", "type": {"hashSet": "bool"}},
+                        {
+                            "name": "pair",
+                            "type": {"tuple": ["f32", {"array": ["u16", 2]}]},
+                        },
+                    ],
+                },
+            },
+        ],
+        "accounts": [
+            {
+                "name": "Book",
+                "type": {
+                    "kind": "struct",
+                    "fields": [
+                        {
+                            "name": "orders",
+                            "type": {"vec": {"defined": {"name": "Order"}}},
+                        },
+                    ],
+                },
+            },
+        ],
+    },
+)
+
+
+def _check_types(types: dict) -> None:
+    side = types["Side"].enum
+    order = {
+        "side": side.Limit(price=10),
+        "owner": list(range(32)),
+        "memo": b"hi",
+        "fills": {1: -5},
+        "flags": {True},
+        "pair": [0.5, [1, 2]],
+    }
+    book = types["Book"]
+    assert book.parse(book.build({"orders": [order]})).orders[0] == order
+
+
+def test_load_schema() -> None:
+    """Check that all type kinds of the schema are supported."""
+    types = load_schema(IDL)
+    assert set(types) == {"Side", "Order", "Book"}
+    _check_types(types)
+
+
+def test_load_schema_decoded() -> None:
+    """Check that an already decoded schema gives the same types."""
+    _check_types(load_schema(json.loads(IDL)))
+    assert schema_source(json.loads(IDL)) == schema_source(IDL)
+
+
+def test_schema_source() -> None:
+    """Check that the exported module defines the same types as load_schema."""
+    namespace: dict = {}
+    exec(schema_source(IDL), namespace)  # noqa: S102,WPS421
+    types = namespace["TYPES"]
+    assert set(types) == set(load_schema(IDL))
+    _check_types(types)
+
+
+@pytest.mark.parametrize(
+    "bad_type",
+    [
+        {"kind": "struct", "fields": [{"name": "a", "type": "u7"}]},
+        {"kind": "struct", "fields": [{"name": "a", "type": {"set": "u8"}}]},
+        {"kind": "struct", "fields": [{"name": "a", "type": {"defined": "A"}}]},
+        {"kind": "struct", "fields": [{"name": "a", "type": {"defined": "B"}}]},
+        {"kind": "struct", "fields": [{"name": "a", "type": {"vec": "u8", "x": 1}}]},
+        {"kind": "union"},
+    ],
+)
+def test_bad_schema_raises(bad_type: dict) -> None:
+    """Check that unknown, undefined and recursive types are rejected."""
+    with pytest.raises(ValueError):
+        load_schema({"types": [{"name": "A", "type": bad_type}]})
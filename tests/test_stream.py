@@ -0,0 +1,110 @@
+"""Streaming build tests."""
+from hashlib import blake2b, sha256
+from io import BytesIO
+from typing import Any
+
+import pytest
+from borsh_construct import (
+    U8,
+    U32,
+    CStruct,
+    HashingSink,
+    HashMap,
+    HashSet,
+    String,
+    Vec,
+    build_hash,
+    build_iter,
+)
+from construct import Construct, RangeError
+
+
+class _UnseekableStream(BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+@pytest.mark.parametrize(
+    "obj_type,obj_input,items",
+    [
+        (Vec(U32), list(range(1000)), range(1000)),
+        (HashMap(String, U8), {"b": 2, "a": 1}, [("a", 1), ("b", 2)]),
+        (HashSet(U8), {3, 1, 2}, [1, 2, 3]),
+    ],
+)
+def test_build_iter(obj_type: Construct, obj_input: Any, items: Any) -> None:
+    """Check that streamed builds match regular builds, with or without length."""
+    expected = obj_type.build(obj_input)
+    for length in (None, len(obj_input)):
+        stream = BytesIO(b"header")
+        stream.seek(0, 2)
+        count = build_iter(obj_type, iter(items), stream, length, chunk_size=16)
+        assert count == len(obj_input)
+        assert stream.getvalue() == b"".join((b"header", expected))
+
+
+def test_build_iter_unseekable() -> None:
+    """Check that unseekable streams work only with a known length."""
+    stream = _UnseekableStream()
+    build_iter(Vec(U8), iter([1, 2]), stream, length=2)
+    assert stream.getvalue() == b"\x02\x00\x00\x00\x01\x02"
+    with pytest.raises(ValueError):
+        build_iter(Vec(U8), iter([1, 2]), _UnseekableStream())
+
+
+@pytest.mark.parametrize("obj_type", [HashMap(U8, U8), HashSet(U8)])
+def test_build_iter_unsorted_raises(obj_type: Construct) -> None:
+    """Check that hash type items must be sorted and unique."""
+    items = [(1, 1), (1, 2)] if isinstance(obj_type, HashMap) else [2, 1]
+    with pytest.raises(ValueError):
+        build_iter(obj_type, items, BytesIO())
+
+
+def test_build_iter_length_mismatch_raises() -> None:
+    """Check that the declared length must match the number of items."""
+    with pytest.raises(RangeError):
+        build_iter(Vec(U8), [1, 2, 3], BytesIO(), length=2)
+    with pytest.raises(RangeError):
+        build_iter(Vec(U8), [1], BytesIO(), length=2)
+    with pytest.raises(RangeError):
+        build_iter(Vec(U8, max_length=2), [1, 2], BytesIO(), length=3)
+    with pytest.raises(RangeError):
+        build_iter(Vec(U8, max_length=2), [1, 2, 3], BytesIO())
+
+
+def test_build_iter_too_many_items_fails_early() -> None:
+    """Check that extra items are neither encoded nor drained."""
+    vec = Vec(U32)
+    items = iter(range(300))
+    with pytest.raises(RangeError):
+        build_iter(vec, items, BytesIO(), length=2)
+    assert next(items) == 3
+    with pytest.raises(RangeError):
+        build_iter(vec, [1, 2, -1], BytesIO(), length=2)
+
+
+def test_build_iter_bad_type_raises() -> None:
+    """Check that only Vec, HashMap and HashSet can be streamed."""
+    with pytest.raises(TypeError):
+        build_iter(String, ["a"], BytesIO())
+
+
+def test_build_hash() -> None:
+    """Check that hashing while building matches hashing the built bytes."""
+    schema = CStruct("name" / String, "scores" / HashMap(String, U32))
+    to_build = {"name": "alice", "scores": {"x": 1, "y": 2}}
+    serialized = schema.build(to_build)
+    assert build_hash(schema, to_build).digest() == sha256(serialized).digest()
+    hasher = build_hash(schema, to_build, blake2b())
+    assert hasher.hexdigest() == blake2b(serialized).hexdigest()
+
+
+def test_hashing_sink_tee() -> None:
+    """Check that a HashingSink can also forward the data it hashes."""
+    out = BytesIO()
+    sink = HashingSink(stream=out)
+    assert sink.writable() and not sink.seekable()
+    build_iter(Vec(U8), range(3), sink, length=3)
+    assert out.getvalue() == Vec(U8).build([0, 1, 2])
+    assert sink.hexdigest() == sha256(out.getvalue()).hexdigest()
+    assert sink.digest() == sha256(out.getvalue()).digest()